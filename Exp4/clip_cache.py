@@ -0,0 +1,176 @@
+import numpy as np
+
+# Clipping against any convex window, with per-edge caching for editors.
+#
+# Each polygon edge is clipped on its own (Cyrus-Beck). The parts of an edge
+# outside the window are replaced by the window corners they sweep past as
+# seen from the window's centre, i.e. the outside of the polygon is projected
+# onto the window boundary. The projection never crosses the window interior,
+# so the result covers exactly polygon & window, and every edge's output
+# depends only on its own two vertices. Moving one vertex therefore only
+# re-clips the two edges that share it.
+
+
+# Corners of a convex window in counter-clockwise order. window is either
+# (xmin, ymin, xmax, ymax) or a sequence of convex polygon vertices.
+def convex_window(window):
+    if len(window) == 4 and np.ndim(window[0]) == 0:
+        xmin, ymin, xmax, ymax = window
+        window = [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)]
+    corners = np.asarray(window, dtype=np.float64).reshape(-1, 2)
+    x, y = corners.T
+    if np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)) < 0:
+        corners = corners[::-1].copy()
+    return corners
+
+
+def _cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+class _Window:
+    def __init__(self, window):
+        self.corners = convex_window(window)
+        self.center = self.corners.mean(axis=0)
+        self.angles = np.arctan2(*(self.corners - self.center).T[::-1])
+        edges = np.roll(self.corners, -1, axis=0) - self.corners
+        # Inward normals: the interior is left of every counter-clockwise edge
+        self.normals = np.column_stack([-edges[:, 1], edges[:, 0]])
+
+    # Corners passed while the projection of from_points moves to to_points,
+    # as an (E, K) mask and the order in which they are passed
+    def sweep(self, from_points, to_points, active):
+        a = np.arctan2(*(from_points - self.center).T[::-1])
+        b = np.arctan2(*(to_points - self.center).T[::-1])
+        turn = np.sign(_cross(from_points - self.center, to_points - self.center))
+        span = np.mod(turn * (b - a), 2 * np.pi)
+        passed = np.mod(turn[:, None] * (self.angles - a[:, None]), 2 * np.pi)
+        # Half-open: a corner exactly at the start was emitted by the edge before
+        mask = (active & (turn != 0))[:, None] & (passed > 0) & (passed <= span[:, None])
+        return mask, np.argsort(np.where(mask, passed, np.inf), axis=1)
+
+    # Output vertices of every edge start -> end, excluding start itself.
+    # Returns packed points, per-edge counts and which edges reach inside.
+    def clip_edges(self, starts, ends):
+        direction = ends - starts
+        num = np.einsum('kj,ekj->ek', self.normals, starts[:, None] - self.corners)
+        den = direction @ self.normals.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = -num / den
+        t0 = np.max(np.where(den > 0, t, 0.0), axis=1, initial=0.0)
+        t1 = np.min(np.where(den < 0, t, 1.0), axis=1, initial=1.0)
+        visible = (t0 <= t1) & ~np.any((den == 0) & (num < 0), axis=1)
+
+        entry = np.where((t0 > 0)[:, None], starts + t0[:, None] * direction, starts)
+        leave = np.where((t1 < 1)[:, None], starts + t1[:, None] * direction, ends)
+        before, before_order = self.sweep(starts, np.where(visible[:, None], entry, ends),
+                                          ~visible | (t0 > 0))
+        after, after_order = self.sweep(leave, ends, visible & (t1 < 1))
+
+        rows = np.arange(len(starts))[:, None]
+        corners = np.broadcast_to(self.corners, (len(starts),) + self.corners.shape)
+        slots = np.concatenate([corners[rows, before_order], entry[:, None],
+                                leave[:, None], corners[rows, after_order]], axis=1)
+        valid = np.concatenate([before[rows, before_order], (visible & (t0 > 0))[:, None],
+                                visible[:, None], after[rows, after_order]], axis=1)
+        return slots[valid], valid.sum(axis=1), visible
+
+    # Number of times a closed vertex loop winds around the window centre
+    def winding(self, vertices):
+        angles = np.arctan2(*(vertices - self.center).T[::-1])
+        turns = np.diff(np.append(angles, angles[:1]))
+        turns = np.mod(turns + np.pi, 2 * np.pi) - np.pi
+        return int(np.rint(turns.sum() / (2 * np.pi)))
+
+
+# Clip many polygons against one convex window, recomputing only what an
+# edit invalidated:
+#   cache = ClipCache((200, 150, 500, 400))
+#   cache.set_polygon('roof', vertices)
+#   cache.move_vertex('roof', 2, (320, 180))   # re-clips two edges
+#   cache.clipped('roof')
+class ClipCache:
+    def __init__(self, window):
+        self._polygons = {}
+        self.edges_clipped = 0
+        self.set_window(window)
+
+    # A new window invalidates every edge
+    def set_window(self, window):
+        self.window = _Window(window)
+        for entry in self._polygons.values():
+            entry['dirty'] = set(range(len(entry['vertices'])))
+            entry['result'] = None
+
+    def set_polygon(self, key, vertices):
+        vertices = np.array(vertices, dtype=np.float64).reshape(-1, 2)
+        n = len(vertices)
+        self._polygons[key] = {'vertices': vertices, 'pieces': [None] * n,
+                               'visible': np.zeros(n, dtype=bool),
+                               'dirty': set(range(n)), 'result': None}
+
+    # Edge i runs from vertex i to vertex i + 1, so a moved vertex dirties
+    # the edge ending at it and the edge starting at it
+    def move_vertex(self, key, index, point):
+        entry = self._polygons[key]
+        n = len(entry['vertices'])
+        entry['vertices'][index] = point
+        entry['dirty'].update(((index - 1) % n, index % n))
+        entry['result'] = None
+
+    def remove(self, key):
+        del self._polygons[key]
+
+    def vertices(self, key):
+        return self._polygons[key]['vertices']
+
+    def __contains__(self, key):
+        return key in self._polygons
+
+    def __iter__(self):
+        return iter(self._polygons)
+
+    # Re-clip every dirty edge of every polygon in one vectorized pass
+    def update(self):
+        keys, edges = [], []
+        for key, entry in self._polygons.items():
+            if entry['dirty']:
+                keys.extend([key] * len(entry['dirty']))
+                edges.extend(sorted(entry['dirty']))
+                entry['dirty'].clear()
+        if not edges:
+            return
+
+        starts, ends = [], []
+        for key, i in zip(keys, edges):
+            vertices = self._polygons[key]['vertices']
+            starts.append(vertices[i])
+            ends.append(vertices[(i + 1) % len(vertices)])
+        starts, ends = np.array(starts), np.array(ends)
+        points, counts, visible = self.window.clip_edges(starts, ends)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        for j, (key, i) in enumerate(zip(keys, edges)):
+            entry = self._polygons[key]
+            entry['pieces'][i] = points[offsets[j]:offsets[j + 1]]
+            entry['visible'][i] = visible[j]
+        self.edges_clipped += len(edges)
+
+    # Clipped vertices of one polygon, (0, 2) when nothing is left
+    def clipped(self, key):
+        entry = self._polygons[key]
+        if entry['dirty']:
+            self.update()
+        if entry['result'] is None:
+            entry['result'] = self._assemble(entry)
+        return entry['result']
+
+    def _assemble(self, entry):
+        if not len(entry['vertices']):
+            return np.empty((0, 2))
+        if entry['visible'].any():
+            return np.concatenate(entry['pieces'])
+        # No edge reaches inside: the window is either enclosed or untouched
+        winding = self.window.winding(entry['vertices'])
+        if winding == 0:
+            return np.empty((0, 2))
+        return self.window.corners if winding > 0 else self.window.corners[::-1]
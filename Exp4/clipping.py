@@ -0,0 +1,223 @@
+import numpy as np
+
+# Batch clipping against an axis-aligned window (xmin, ymin, xmax, ymax), the
+# clip_window layout of exp4_polygon_clipping.py.
+#
+# Many polygons travel as one ragged array: a flat (M, 2) float vertex array
+# plus offsets, so the vertices of polygon i are
+# vertices[offsets[i]:offsets[i + 1]].
+
+LEFT, RIGHT, BOTTOM, TOP = 0, 1, 2, 3
+
+# Outcode bits of cohen_sutherland_line_clip()
+INSIDE, OUT_LEFT, OUT_RIGHT, OUT_BOTTOM, OUT_TOP = 0, 1, 2, 4, 8
+
+
+# Pack a list of vertex lists into (vertices, offsets)
+def pack_polygons(polygons):
+    counts = np.array([len(p) for p in polygons], dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    vertices = np.empty((offsets[-1], 2), dtype=np.float64)
+    for polygon, start, stop in zip(polygons, offsets[:-1], offsets[1:]):
+        vertices[start:stop] = np.reshape(polygon, (-1, 2))
+    return vertices, offsets
+
+
+# Split (vertices, offsets) back into one array per polygon
+def unpack_polygons(vertices, offsets):
+    return [vertices[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+# Bounding box (xmin, ymin, xmax, ymax) of every polygon; an empty polygon
+# gets an inverted box that overlaps nothing
+def polygon_bounds(vertices, offsets):
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    bounds = np.empty((len(offsets) - 1, 4))
+    bounds[:, :2], bounds[:, 2:] = np.inf, -np.inf
+    nonempty = np.flatnonzero(np.diff(offsets))
+    if len(nonempty):
+        bounds[nonempty, :2] = np.minimum.reduceat(vertices, offsets[nonempty])
+        bounds[nonempty, 2:] = np.maximum.reduceat(vertices, offsets[nonempty])
+    return bounds
+
+
+# Flat indices of every vertex of the selected polygons, in order
+def _ragged_index(offsets, polygons):
+    counts = offsets[polygons + 1] - offsets[polygons]
+    starts = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+    return np.repeat(offsets[polygons] - starts, counts) + np.arange(counts.sum())
+
+
+# Index of the previous vertex of every vertex, wrapping within its polygon
+def _previous(offsets):
+    previous = np.arange(offsets[-1]) - 1
+    closed = offsets[1:] > offsets[:-1]
+    previous[offsets[:-1][closed]] = offsets[1:][closed] - 1
+    return previous
+
+
+# One Sutherland-Hodgman pass of every polygon against one window edge.
+# A vertex e with predecessor s emits I(s, e) when the edge is crossed and
+# then e when e is inside, so each vertex emits zero, one or two vertices.
+def _clip_edge(vertices, offsets, edge, bound):
+    axis = 0 if edge in (LEFT, RIGHT) else 1
+    coord = vertices[:, axis]
+    inside = coord >= bound if edge in (LEFT, BOTTOM) else coord <= bound
+    previous = _previous(offsets)
+    crossing = inside != inside[previous]
+
+    # The crossing point lies exactly on the edge; its other coordinate is
+    # interpolated. Crossing implies the two coordinates differ, no nudging.
+    s, e = vertices[previous[crossing]], vertices[crossing]
+    t = (bound - s[:, axis]) / (e[:, axis] - s[:, axis])
+    cut = s + t[:, None] * (e - s)
+    cut[:, axis] = bound
+
+    emitted = crossing.astype(np.int64) + inside
+    total = np.zeros(len(emitted) + 1, dtype=np.int64)
+    np.cumsum(emitted, out=total[1:])
+    new_offsets = total[offsets]
+
+    slot = total[:-1]
+    out = np.empty((total[-1], 2), dtype=vertices.dtype)
+    out[slot[crossing]] = cut
+    out[slot[inside] + crossing[inside]] = vertices[inside]
+    return out, new_offsets
+
+
+# Clip many polygons against window = (xmin, ymin, xmax, ymax) in one call.
+# Polygons entirely inside are passed through and polygons entirely beyond
+# one edge are emptied without clipping; the rest are clipped edge by edge.
+# Returns the clipped (vertices, offsets); an emptied polygon keeps its slot
+# with no vertices.
+def clip_polygons(vertices, offsets, window):
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    xmin, ymin, xmax, ymax = window
+
+    low_x, low_y, high_x, high_y = polygon_bounds(vertices, offsets).T
+    accept = (low_x >= xmin) & (high_x <= xmax) & (low_y >= ymin) & (high_y <= ymax)
+    reject = (high_x < xmin) | (low_x > xmax) | (high_y < ymin) | (low_y > ymax)
+    return clip_subset(vertices, offsets, window,
+                       np.flatnonzero(accept), np.flatnonzero(~accept & ~reject))
+
+
+# Clip with the trivial accepts and rejects already known: the polygons
+# listed in inside pass through whole, those in straddling are clipped edge
+# by edge and every other polygon is emptied. Same output as clip_polygons().
+def clip_subset(vertices, offsets, window, inside, straddling):
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    inside = np.asarray(inside, dtype=np.int64)
+    straddling = np.asarray(straddling, dtype=np.int64)
+    xmin, ymin, xmax, ymax = window
+    counts = np.diff(offsets)
+
+    part = vertices[_ragged_index(offsets, straddling)]
+    part_offsets = np.zeros(len(straddling) + 1, dtype=np.int64)
+    np.cumsum(counts[straddling], out=part_offsets[1:])
+    for edge, bound in ((LEFT, xmin), (RIGHT, xmax), (BOTTOM, ymin), (TOP, ymax)):
+        part, part_offsets = _clip_edge(part, part_offsets, edge, bound)
+
+    new_counts = np.zeros(len(counts), dtype=np.int64)
+    new_counts[inside] = counts[inside]
+    new_counts[straddling] = np.diff(part_offsets)
+    new_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(new_counts, out=new_offsets[1:])
+    out = np.empty((new_offsets[-1], 2), dtype=np.float64)
+    out[_ragged_index(new_offsets, inside)] = vertices[_ragged_index(offsets, inside)]
+    out[_ragged_index(new_offsets, straddling)] = part
+    return out, new_offsets
+
+
+# Cohen-Sutherland outcodes of arrays of points
+def outcodes(x, y, window):
+    xmin, ymin, xmax, ymax = window
+    codes = (x < xmin).astype(np.uint8)
+    codes |= (x > xmax).astype(np.uint8) << 1
+    codes |= (y < ymin).astype(np.uint8) << 2
+    codes |= (y > ymax).astype(np.uint8) << 3
+    return codes
+
+
+# Parameter range [enter, leave] of x1 + t * d inside [low, high] along one
+# axis. A segment parallel to the axis is inside for all t or for none.
+def _slab(x1, d, low, high):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = 1 / d
+        ta = (low - x1) * inverse
+        tb = (high - x1) * inverse
+    enter, leave = np.minimum(ta, tb), np.maximum(ta, tb)
+    parallel = np.flatnonzero(d == 0)
+    if len(parallel):
+        x = x1[parallel]
+        inside = (x >= low) & (x <= high)
+        enter[parallel] = np.where(inside, -np.inf, np.inf)
+        leave[parallel] = np.where(inside, np.inf, -np.inf)
+    return enter, leave
+
+
+# Liang-Barsky clip of segments that are neither trivially in nor out.
+# Returns the clipped segments and which of them are visible at all.
+def _liang_barsky(segments, window):
+    xmin, ymin, xmax, ymax = window
+    x1, y1, x2, y2 = segments.T
+    dx, dy = x2 - x1, y2 - y1
+    enter_x, leave_x = _slab(x1, dx, xmin, xmax)
+    enter_y, leave_y = _slab(y1, dy, ymin, ymax)
+    t0 = np.maximum(np.maximum(enter_x, enter_y), 0.0)
+    t1 = np.minimum(np.minimum(leave_x, leave_y), 1.0)
+    visible = t0 <= t1
+
+    clipped = np.column_stack([x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy])
+    return clipped, visible
+
+
+# Clip an (N, 4) array of x1, y1, x2, y2 segments against
+# window = (xmin, ymin, xmax, ymax). Outcodes give trivial accepts and
+# rejects for all segments at once; only the rest take the Liang-Barsky path.
+# Returns the visible segments, as float64 or rounded to int64 when integer
+# is set, and a mask of which input segments they came from.
+def clip_segments(segments, window, integer=False):
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    code1 = outcodes(segments[:, 0], segments[:, 1], window)
+    code2 = outcodes(segments[:, 2], segments[:, 3], window)
+    accept = (code1 | code2) == INSIDE
+    reject = (code1 & code2) != INSIDE
+
+    keep = accept.copy()
+    clipped = segments.copy()
+    partial = np.flatnonzero(~accept & ~reject)
+    clipped[partial], visible = _liang_barsky(segments[partial], window)
+    keep[partial] = visible
+
+    clipped = clipped[keep]
+    if integer:
+        clipped = np.rint(clipped).astype(np.int64)
+    return clipped, keep
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 200_000
+    sides = rng.integers(4, 9, n)
+    angle = np.sort(rng.random((n, 8)) * 2 * np.pi, axis=1)
+    centers = rng.random((n, 1, 2)) * 1200 - 100
+    footprints = centers + 15 * np.stack([np.cos(angle), np.sin(angle)], axis=2)
+    vertices, offsets = pack_polygons([f[:k] for f, k in zip(footprints, sides)])
+
+    start = time.perf_counter()
+    clipped, clipped_offsets = clip_polygons(vertices, offsets, (0, 0, 1000, 1000))
+    print(f"{n} polygons, {len(vertices)} -> {len(clipped)} vertices "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    segments = rng.random((1_000_000, 4)) * 1400 - 200
+    start = time.perf_counter()
+    visible, keep = clip_segments(segments, (0, 0, 1000, 1000))
+    print(f"{len(segments)} segments, {keep.sum()} visible "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -1,6 +1,16 @@
+import os
 import pygame
 import sys
 
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'Experiment 1'))
+
+from clip_cache import ClipCache
+from framebuffer import Framebuffer
+from line_raster import draw_lines
+
 def cohen_sutherland_line_clip(x1, y1, x2, y2, xmin, ymin, xmax, ymax):
     INSIDE = 0
     LEFT = 1
@@ -103,32 +113,94 @@ def sutherland_hodgman_clip(polygon, clip_window):
     
     return output_list
 
+# Closed outline of a vertex loop, thickened by drawing it shifted along x and y
+def draw_outline(frame, points, color, width=1):
+    points = np.rint(np.asarray(points, dtype=np.float64)).astype(np.int64)
+    segments = np.hstack([points, np.roll(points, -1, axis=0)])
+    for k in range(width):
+        shift = k - width // 2
+        draw_lines(frame, segments + (shift, 0, shift, 0), color)
+        draw_lines(frame, segments + (0, shift, 0, shift), color)
+
+# Rectangle (x, y, w, h) covering the window and the polygon, padded for the
+# outline widths; everything the loop draws lies inside it
+def scene_rect(clip_window, vertices):
+    xmin, ymin, xmax, ymax = clip_window
+    low = np.minimum(vertices.min(axis=0), (xmin, ymin)) - 3
+    high = np.maximum(vertices.max(axis=0), (xmax, ymax)) + 3
+    return int(low[0]), int(low[1]), int(high[0] - low[0]) + 1, int(high[1] - low[1]) + 1
+
 pygame.init()
 screen = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("Polygon Clipping")
 
+# Frames are drawn into a framebuffer; only the area the last and the new
+# scene cover is cleared, and only the dirty rectangles reach the display
+frame = Framebuffer(800, 600)
+drawn = (0, 0, 800, 600)
+
 polygon = [(100, 100), (200, 150), (300, 100), (250, 200), (150, 200)]
 clip_window = (200, 150, 500, 400)
 
+# Clipping is only redone when a vertex is dragged or the window resized;
+# dragging a vertex re-clips just the two edges that meet at it
+cache = ClipCache(clip_window)
+cache.set_polygon('polygon', polygon)
+GRAB_RADIUS = 8
+
 clock = pygame.time.Clock()
 running = True
+dragging = None
+changed = True
 
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
-    
-    screen.fill((0, 0, 0))
-    
-    pygame.draw.polygon(screen, (255, 0, 0), polygon, 2)
-    pygame.draw.rect(screen, (0, 255, 0), clip_window, 2)
-    
-    clipped_polygon = sutherland_hodgman_clip(polygon, clip_window)
-    if clipped_polygon and len(clipped_polygon) > 2:
-        pygame.draw.polygon(screen, (0, 0, 255), clipped_polygon, 3)
-    
-    pygame.display.flip()
+        elif event.type == pygame.VIDEOEXPOSE:
+            frame.mark_dirty(0, 0, frame.width, frame.height)
+            changed = True
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            x, y = event.pos
+            near = [i for i, (px, py) in enumerate(cache.vertices('polygon'))
+                    if abs(px - x) <= GRAB_RADIUS and abs(py - y) <= GRAB_RADIUS]
+            if near:
+                dragging = near[0]
+            elif abs(x - clip_window[2]) <= GRAB_RADIUS and abs(y - clip_window[3]) <= GRAB_RADIUS:
+                dragging = 'window'
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            dragging = None
+        elif event.type == pygame.MOUSEMOTION and dragging is not None:
+            x, y = event.pos
+            if dragging == 'window':
+                clip_window = (clip_window[0], clip_window[1],
+                               max(x, clip_window[0] + 1), max(y, clip_window[1] + 1))
+                cache.set_window(clip_window)
+            else:
+                cache.move_vertex('polygon', dragging, (x, y))
+            changed = True
+
+    if changed:
+        xmin, ymin, xmax, ymax = clip_window
+        # Clear the union of the last scene and this one
+        scene = scene_rect(clip_window, cache.vertices('polygon'))
+        x0, y0 = max(min(scene[0], drawn[0]), 0), max(min(scene[1], drawn[1]), 0)
+        x1 = max(scene[0] + scene[2], drawn[0] + drawn[2])
+        y1 = max(scene[1] + scene[3], drawn[1] + drawn[3])
+        frame[y0:y1, x0:x1] = 0
+        drawn = scene
+
+        draw_outline(frame, cache.vertices('polygon'), (255, 0, 0), 2)
+        draw_outline(frame, [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)],
+                     (0, 255, 0), 2)
+
+        clipped_polygon = cache.clipped('polygon')
+        if len(clipped_polygon) > 2:
+            draw_outline(frame, clipped_polygon, (0, 0, 255), 3)
+
+        pygame.display.update(frame.present(screen))
+        changed = False
     clock.tick(60)
 
 pygame.quit()
-sys.exit()
\ No newline at end of file
+sys.exit()
@@ -0,0 +1,159 @@
+import numpy as np
+
+from clipping import clip_subset, polygon_bounds
+
+# Once more than this fraction of the polygons has moved out of its grid
+# cell, the next query rebuilds the grid instead of testing them one by one
+REBUILD_FRACTION = 0.05
+
+
+# Uniform grid over polygon bounding boxes for trivial accept/reject before
+# clipping. Every polygon lives in the cell holding the centre of its box,
+# and each cell keeps the union box of its polygons, so a whole cell is
+# accepted or rejected against the window at once. Only the polygons of
+# cells crossing the window boundary are tested one by one:
+#   index = GridIndex.from_polygons(vertices, offsets)
+#   inside, straddling = index.classify((xmin, ymin, xmax, ymax))
+# inside passes through unclipped and only straddling goes to the clipper;
+# index.clip(vertices, offsets, window) does both in one call.
+class GridIndex:
+    def __init__(self, bounds, cell_size=None):
+        self.bounds = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+        self.cell_size = cell_size
+        self.rebuild()
+
+    @classmethod
+    def from_polygons(cls, vertices, offsets, cell_size=None):
+        return cls(polygon_bounds(vertices, offsets), cell_size)
+
+    # Sort every polygon into its cell; O(N log N) and fully vectorized
+    def rebuild(self):
+        bounds = self.bounds
+        finite = np.all(np.isfinite(bounds), axis=1) & (bounds[:, 0] <= bounds[:, 2])
+        low = bounds[finite, :2].min(axis=0) if finite.any() else np.zeros(2)
+        high = bounds[finite, 2:].max(axis=0) if finite.any() else np.ones(2)
+        if self.cell_size is None:
+            # About 16 polygons per cell on average
+            area = max(np.prod(high - low), 1.0)
+            self.cell_size = float(np.sqrt(area * 16 / max(finite.sum(), 1)))
+        self.origin = low
+        self.shape = np.maximum(np.ceil((high - low) / self.cell_size).astype(np.int64), 1)
+
+        # Empty polygons get cell -1 and sort ahead of every real cell
+        cells = np.full(len(bounds), -1, dtype=np.int64)
+        cells[finite] = self._cell_of(bounds[finite])
+        self.cells = cells
+        self.order = np.argsort(cells, kind='stable')[len(cells) - finite.sum():]
+        counts = np.bincount(cells[finite], minlength=int(np.prod(self.shape)))
+        self.starts = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.starts[1:])
+
+        self.cell_bounds = np.empty((len(counts), 4))
+        self.cell_bounds[:, :2], self.cell_bounds[:, 2:] = np.inf, -np.inf
+        np.minimum.at(self.cell_bounds[:, 0], cells[finite], bounds[finite, 0])
+        np.minimum.at(self.cell_bounds[:, 1], cells[finite], bounds[finite, 1])
+        np.maximum.at(self.cell_bounds[:, 2], cells[finite], bounds[finite, 2])
+        np.maximum.at(self.cell_bounds[:, 3], cells[finite], bounds[finite, 3])
+        self.moved = set()
+
+    def _cell_of(self, bounds):
+        center = (bounds[:, :2] + bounds[:, 2:]) / 2
+        ij = np.floor((center - self.origin) / self.cell_size).astype(np.int64)
+        ij = np.clip(ij, 0, self.shape - 1)
+        return ij[:, 1] * self.shape[0] + ij[:, 0]
+
+    # New bounding boxes for some polygons. A polygon that stays in its cell
+    # only widens the cell's union box; one that changes cell is tested
+    # individually until the next rebuild.
+    def update(self, index, bounds):
+        index = np.atleast_1d(np.asarray(index, dtype=np.int64))
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self.bounds[index] = bounds
+        cells = self._cell_of(bounds)
+        same = cells == self.cells[index]
+        for cell, box in zip(cells[same], bounds[same]):
+            union = self.cell_bounds[cell]
+            union[:2] = np.minimum(union[:2], box[:2])
+            union[2:] = np.maximum(union[2:], box[2:])
+        self.moved.update(index[~same].tolist())
+
+    # Split the polygons into (inside, straddling) index arrays for
+    # window = (xmin, ymin, xmax, ymax); every other polygon is outside.
+    def classify(self, window):
+        if len(self.moved) > REBUILD_FRACTION * len(self.bounds):
+            self.rebuild()
+        xmin, ymin, xmax, ymax = window
+        cb = self.cell_bounds
+        cell_inside = (cb[:, 0] >= xmin) & (cb[:, 2] <= xmax) & (cb[:, 1] >= ymin) & (cb[:, 3] <= ymax)
+        cell_outside = (cb[:, 2] < xmin) | (cb[:, 0] > xmax) | (cb[:, 3] < ymin) | (cb[:, 1] > ymax)
+        boundary = np.flatnonzero(~cell_inside & ~cell_outside)
+
+        inside = self._members(np.flatnonzero(cell_inside))
+        candidates = self._members(boundary)
+        if self.moved:
+            moved = np.fromiter(self.moved, dtype=np.int64, count=len(self.moved))
+            inside = inside[~np.isin(inside, moved)]
+            candidates = np.concatenate([candidates[~np.isin(candidates, moved)], moved])
+
+        box = self.bounds[candidates]
+        accept = (box[:, 0] >= xmin) & (box[:, 2] <= xmax) & (box[:, 1] >= ymin) & (box[:, 3] <= ymax)
+        reject = (box[:, 2] < xmin) | (box[:, 0] > xmax) | (box[:, 3] < ymin) | (box[:, 1] > ymax)
+        inside = np.concatenate([inside, candidates[accept]])
+        return np.sort(inside), np.sort(candidates[~accept & ~reject])
+
+    # Clip the polygons the index was built from against window: inside
+    # cells are kept whole, outside cells dropped and only the straddling
+    # polygons clipped. Same (vertices, offsets) as clip_polygons().
+    def clip(self, vertices, offsets, window):
+        inside, straddling = self.classify(window)
+        return clip_subset(vertices, offsets, window, inside, straddling)
+
+    # Polygons stored in the given cells
+    def _members(self, cells):
+        counts = self.starts[cells + 1] - self.starts[cells]
+        first = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=first[1:])
+        slots = np.repeat(self.starts[cells] - first, counts) + np.arange(counts.sum())
+        return self.order[slots]
+
+
+if __name__ == "__main__":
+    import time
+
+    from clipping import clip_polygons, pack_polygons
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    low = rng.random((n, 2)) * 100_000
+    bounds = np.column_stack([low, low + rng.random((n, 2)) * 40])
+
+    start = time.perf_counter()
+    index = GridIndex(bounds)
+    print(f"built {n} boxes into {index.shape} cells "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for x in range(0, 5000, 1000):
+        start = time.perf_counter()
+        inside, straddling = index.classify((x, 0, x + 20_000, 15_000))
+        print(f"window at x={x}: {len(inside)} inside, {len(straddling)} straddling "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Clipping a scene of small polygons through the index against clipping
+    # every polygon; both give the same vertices
+    n = 200_000
+    angle = np.sort(rng.random((n, 6)) * 2 * np.pi, axis=1)
+    centers = rng.random((n, 1, 2)) * 20_000
+    footprints = centers + 15 * np.stack([np.cos(angle), np.sin(angle)], axis=2)
+    vertices, offsets = pack_polygons(footprints)
+    index = GridIndex.from_polygons(vertices, offsets)
+    window = (2_000, 3_000, 9_000, 7_000)
+
+    start = time.perf_counter()
+    clipped, clipped_offsets = index.clip(vertices, offsets, window)
+    indexed = time.perf_counter() - start
+    start = time.perf_counter()
+    expected, expected_offsets = clip_polygons(vertices, offsets, window)
+    full = time.perf_counter() - start
+    assert np.array_equal(clipped_offsets, expected_offsets) and np.allclose(clipped, expected)
+    print(f"clipped {n} polygons in {indexed * 1000:.1f} ms through the index, "
+          f"{full * 1000:.1f} ms testing every polygon")
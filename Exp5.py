@@ -1,10 +1,17 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
-def draw_edges(ax, vertices, edges, color='b'):
-    lines = [(vertices[start], vertices[end]) for start, end in edges]
-    ax.add_collection3d(Line3DCollection(lines, colors=color))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exp5'))
+from instancing import instance_edges, per_instance
+
+# Every instance of one mesh in a single collection, one colour per instance
+def draw_instances(ax, vertices, edges, matrices, colors):
+    lines = instance_edges(vertices, edges, matrices)
+    ax.add_collection3d(Line3DCollection(lines, colors=per_instance(colors, len(edges)).tolist()))
 
 def translation_matrix(tx, ty, tz):
     return np.array([[1, 0, 0, tx],
@@ -25,14 +32,6 @@ def rotation_matrix_z(angle):
                      [0,           0,          1, 0],
                      [0,           0,          0, 1]])
 
-def apply_transform(vertices, matrix):
-    transformed = []
-    for v in vertices:
-        vec = np.array([*v, 1])
-        result = matrix @ vec
-        transformed.append(result[:3])
-    return transformed
-
 vertices = [(0,0,0), (1,0,0), (1,1,0), (0,1,0),
             (0,0,1), (1,0,1), (1,1,1), (0,1,1)]
 edges = [(0,1), (1,2), (2,3), (3,0),
@@ -42,13 +41,11 @@ edges = [(0,1), (1,2), (2,3), (3,0),
 T = translation_matrix(2, 2, 0)
 S = scaling_matrix(1.5, 1.5, 1.5)
 R = rotation_matrix_z(45)
-transformed_vertices = apply_transform(vertices, T @ S @ R)
 
 fig = plt.figure()
 ax = fig.add_subplot(111, projection='3d')
 
-draw_edges(ax, vertices, edges, 'blue')
-draw_edges(ax, transformed_vertices, edges, 'red')
+draw_instances(ax, vertices, edges, [np.eye(4), T @ S @ R], ['blue', 'red'])
 
 ax.set_title("3D Transformation of Cube")
 ax.set_xlabel('X')
@@ -1,18 +1,26 @@
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import numpy as np
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exp5'))
+from instancing import instance_faces
 vertices = np.array([[0,0,0], [1,0,0], [1,1,0], [0,1,0],
  [0,0,1], [1,0,1], [1,1,1], [0,1,1]])
-faces = [[vertices[j] for j in [0,1,2,3]],
- [vertices[j] for j in [4,5,6,7]],
- [vertices[j] for j in [0,1,5,4]],
- [vertices[j] for j in [2,3,7,6]],
- [vertices[j] for j in [1,2,6,5]],
- [vertices[j] for j in [4,7,3,0]]]
+faces = [[0,1,2,3],
+ [4,5,6,7],
+ [0,1,5,4],
+ [2,3,7,6],
+ [1,2,6,5],
+ [4,7,3,0]]
 colors = ['red', 'blue', 'green', 'yellow', 'cyan', 'orange']
+# Instance matrices of the cubes to draw; every instance goes into one collection
+instances = [np.eye(4)]
 fig = plt.figure()
 ax = fig.add_subplot(111, projection='3d')
-poly3d = Poly3DCollection(faces, facecolors=colors, edgecolors='black', linewidths=1)
+poly3d = Poly3DCollection(instance_faces(vertices, faces, instances),
+                          facecolors=np.tile(colors, len(instances)).tolist(),
+                          edgecolors='black', linewidths=1)
 ax.add_collection3d(poly3d)
 
 # Set view
@@ -0,0 +1,191 @@
+from functools import lru_cache
+
+import numpy as np
+
+from line_raster import CHUNK_PIXELS, draw_spans, span_pixels
+
+
+# One quadrant of the midpoint ellipse, the same (x, y) points that
+# Midpoint-ellipse-algorithm.py plots in region 1 and region 2.
+# A zero radius gives the centre pixel or a straight line along the other axis.
+@lru_cache(maxsize=256)
+def ellipse_quadrant(rx, ry):
+    if rx < 0 or ry < 0:
+        raise ValueError(f"ellipse radii must be non-negative, got {rx}, {ry}")
+    if rx == 0 or ry == 0:
+        # One of the two ranges has a single element and broadcasts
+        x, y = np.broadcast_arrays(np.arange(rx + 1, dtype=np.int64),
+                                   np.arange(ry, -1, -1, dtype=np.int64))
+        x, y = x.copy(), y.copy()
+        x.flags.writeable = False
+        y.flags.writeable = False
+        return x, y
+
+    rx2, ry2 = rx * rx, ry * ry
+    x_points, y_points = [], []
+    x, y = 0, ry
+
+    p1 = ry2 + (0.25 * rx2) - (rx2 * ry)
+    while 2 * ry2 * x <= 2 * rx2 * y:
+        x_points.append(x)
+        y_points.append(y)
+        if p1 < 0:
+            x += 1
+            p1 = p1 + (2 * ry2 * x) + ry2
+        else:
+            x += 1
+            y -= 1
+            p1 = p1 + (2 * ry2 * x) - (2 * rx2 * y) + ry2
+
+    p2 = ry2 * ((x + 0.5)**2) + (rx2 * ((y - 1)**2)) - (rx2 * ry2)
+    while y >= 0:
+        x_points.append(x)
+        y_points.append(y)
+        if p2 > 0:
+            y -= 1
+            p2 = p2 - (2 * rx2 * y) + rx2
+        else:
+            x += 1
+            y -= 1
+            p2 = p2 + (2 * ry2 * x) - (2 * rx2 * y) + rx2
+
+    x = np.array(x_points, dtype=np.int64)
+    y = np.array(y_points, dtype=np.int64)
+    x.flags.writeable = False
+    y.flags.writeable = False
+    return x, y
+
+
+# Pixel offsets of an axis-aligned ellipse: the quadrant mirrored four ways,
+# each pixel on the axes kept once. y grows downwards, as on the canvas.
+@lru_cache(maxsize=256)
+def ellipse_offsets(rx, ry):
+    x, y = ellipse_quadrant(rx, ry)
+    dx = np.concatenate([x, -x, x, -x])
+    dy = np.concatenate([-y, -y, y, y])
+    size = 2 * max(rx, ry, x.max(initial=0)) + 1
+    half = size // 2
+    packed = np.unique((dx + half) * size + (dy + half))
+    dx, dy = packed // size - half, packed % size - half
+    dx.flags.writeable = False
+    dy.flags.writeable = False
+    return dx, dy
+
+
+# Row extents of a filled ellipse as (dy, x0, x1) offsets, x1 inclusive.
+# angle is in degrees, counter-clockwise as seen on screen.
+@lru_cache(maxsize=256)
+def ellipse_rows(rx, ry, angle=0.0):
+    if angle % 180 == 0:
+        dx, dy = ellipse_offsets(rx, ry)
+        rows = np.arange(-ry, ry + 1)
+        half = np.zeros(len(rows), dtype=np.int64)
+        np.maximum.at(half, dy + ry, np.abs(dx))
+        return rows, -half, half
+
+    # Solve the rotated ellipse equation for x on every pixel row (y up)
+    theta = np.radians(angle)
+    c, s = np.cos(theta), np.sin(theta)
+    a2, b2 = max(rx, 0.5)**2, max(ry, 0.5)**2
+    extent = int(np.ceil(np.sqrt(a2 * s * s + b2 * c * c)))
+    rows = np.arange(-extent, extent + 1)
+    up = -rows.astype(np.float64)
+    qa = c * c / a2 + s * s / b2
+    qb = 2 * up * c * s * (1 / a2 - 1 / b2)
+    qc = up * up * (s * s / a2 + c * c / b2) - 1
+    disc = qb * qb - 4 * qa * qc
+    root = np.sqrt(np.maximum(disc, 0))
+    x0 = np.ceil((-qb - root) / (2 * qa) - 0.5).astype(np.int64)
+    x1 = np.floor((-qb + root) / (2 * qa) + 0.5).astype(np.int64)
+    keep = (disc >= 0) & (x0 <= x1)
+    return rows[keep], x0[keep], x1[keep]
+
+
+# Outline of a filled shape given as one span per row: the pixels of each row
+# that have no 4-neighbour on the row above or below, as left and right spans
+def outline_spans(rows, x0, x1):
+    above_0 = np.r_[np.iinfo(np.int64).max, x0[:-1]]
+    above_1 = np.r_[np.iinfo(np.int64).min, x1[:-1]]
+    below_0 = np.r_[x0[1:], np.iinfo(np.int64).max]
+    below_1 = np.r_[x1[1:], np.iinfo(np.int64).min]
+    # A missing neighbour row means the whole row is outline
+    gap_above = np.r_[True, np.diff(rows) != 1]
+    gap_below = np.r_[np.diff(rows) != 1, True]
+    inner_0 = np.where(gap_above | gap_below, x1 + 1, np.maximum(above_0, below_0))
+    inner_1 = np.where(gap_above | gap_below, x0 - 1, np.minimum(above_1, below_1))
+
+    left_1 = np.minimum(np.maximum(inner_0 - 1, x0), x1)
+    right_0 = np.maximum(np.minimum(inner_1 + 1, x1), left_1 + 1)
+    right = right_0 <= x1
+    return (np.concatenate([rows, rows[right]]),
+            np.concatenate([x0, right_0[right]]),
+            np.concatenate([left_1, x1[right]]))
+
+
+# Pixels of one ellipse centred on the origin (outline, or filled when asked)
+def ellipse_pixels(rx, ry, angle=0.0, filled=False):
+    if angle % 180 == 0 and not filled:
+        return ellipse_offsets(int(rx), int(ry))
+    rows, x0, x1 = ellipse_rows(int(rx), int(ry), float(angle))
+    if not filled:
+        rows, x0, x1 = outline_spans(rows, x0, x1)
+    return span_pixels(rows, x0, x1)
+
+
+def _as_ellipses(centers, rx, ry, angle):
+    centers = np.asarray(centers, dtype=np.int64).reshape(-1, 2)
+    n = len(centers)
+    rx = np.broadcast_to(np.asarray(rx, dtype=np.int64), (n,))
+    ry = np.broadcast_to(np.asarray(ry, dtype=np.int64), (n,))
+    angle = np.broadcast_to(np.asarray(angle, dtype=np.float64), (n,))
+    return centers, rx, ry, angle
+
+
+# Draw many ellipses into canvas[y, x]. rx, ry and angle (degrees) are scalars
+# or one value per ellipse; ellipses sharing a shape are drawn in one pass.
+def draw_ellipses(canvas, centers, rx, ry, color, angle=0.0, filled=False):
+    centers, rx, ry, angle = _as_ellipses(centers, rx, ry, angle)
+    height, width = canvas.shape[:2]
+    shapes, inverse = np.unique(np.column_stack([rx, ry, angle]), axis=0,
+                                return_inverse=True)
+    inverse = inverse.ravel()
+
+    for i, (a, b, theta) in enumerate(shapes):
+        index = np.flatnonzero(inverse == i)
+        rows, x0, x1 = ellipse_rows(int(a), int(b), float(theta))
+        if not filled and theta % 180 != 0:
+            rows, x0, x1 = outline_spans(rows, x0, x1)
+        elif not filled:
+            dx, dy = ellipse_offsets(int(a), int(b))
+            step = max(1, CHUNK_PIXELS // len(dx))
+            for j in range(0, len(index), step):
+                part = index[j:j + step]
+                xs = (centers[part, :1] + dx).ravel()
+                ys = (centers[part, 1:] + dy).ravel()
+                keep = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+                canvas[ys[keep], xs[keep]] = color
+            continue
+
+        cx, cy = centers[index, :1], centers[index, 1:]
+        draw_spans(canvas, cy + rows, cx + x0, cx + x1, color)
+    return canvas
+
+
+if __name__ == "__main__":
+    import time
+    import matplotlib.pyplot as plt
+
+    rx = int(input("Enter the radius along x: "))
+    ry = int(input("Enter the radius along y: "))
+
+    start = time.perf_counter()
+    xs, ys = ellipse_pixels(rx, ry)
+    print(f"{len(xs)} pixels in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    plt.plot(xs, -ys, 'o', color='red', markersize=2)
+    plt.title("Ellipse drawn using Midpoint Ellipse Algorithm")
+    plt.xlabel("X-axis")
+    plt.ylabel("Y-axis")
+    plt.grid(True)
+    plt.gca().set_aspect('equal', adjustable='box')
+    plt.show()
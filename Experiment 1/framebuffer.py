@@ -0,0 +1,211 @@
+import struct
+import zlib
+
+import numpy as np
+
+# Once more rectangles than this are dirty they are merged into their union,
+# pygame.display.update gains nothing from hundreds of tiny rectangles
+MAX_DIRTY_RECTS = 32
+
+
+# Screen of contiguous uint8 (H, W, C) pixels that every rasterizer can draw
+# into as if it were the canvas array itself. Each write through
+# framebuffer[...] = color records the bounding rectangle it touched, so a
+# front-end only has to copy and update the regions that changed.
+class Framebuffer:
+    def __init__(self, width, height, channels=3, background=0):
+        if channels not in (1, 3, 4):
+            raise ValueError("channels must be 1, 3 or 4")
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        self.pixels = np.empty(shape, dtype=np.uint8)
+        self.pixels[...] = background
+        self.width, self.height, self.channels = width, height, channels
+        self.dirty = [(0, 0, width, height)]
+
+    # Anything not defined here (shape, ndim, flags, view, astype, ...) comes
+    # from the pixel array, so rasterizers can treat this object as a canvas
+    def __getattr__(self, name):
+        if name == 'pixels':
+            raise AttributeError(name)
+        return getattr(self.pixels, name)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.pixels if dtype is None else self.pixels.astype(dtype)
+
+    def __getitem__(self, key):
+        return self.pixels[key]
+
+    def __setitem__(self, key, value):
+        self.pixels[key] = value
+        rect = self._key_rect(key)
+        if rect is not None:
+            self.mark_dirty(*rect)
+
+    # One uint32 per pixel, shared with pixels (4-channel buffers only)
+    @property
+    def packed(self):
+        if self.channels != 4:
+            raise ValueError("packed view needs a 4-channel framebuffer")
+        return self.pixels.view(np.uint32)[..., 0]
+
+    # Bounding rectangle (x, y, w, h) of the pixels an index key writes to,
+    # or None when the key selects nothing
+    def _key_rect(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) == 1 and np.ndim(key[0]) >= 2:
+            mask = np.asarray(key[0])
+            if mask.dtype == bool:
+                rows = np.flatnonzero(mask.any(axis=1))
+                cols = np.flatnonzero(mask.any(axis=0))
+                if not len(rows):
+                    return None
+                return cols[0], rows[0], cols[-1] - cols[0] + 1, rows[-1] - rows[0] + 1
+        if any(k is Ellipsis for k in key[:2]):
+            return 0, 0, self.width, self.height
+
+        ys = _axis_extent(key[0], self.height)
+        xs = _axis_extent(key[1], self.width) if len(key) > 1 else (0, self.width)
+        if ys is None or xs is None:
+            return None
+        return xs[0], ys[0], xs[1] - xs[0], ys[1] - ys[0]
+
+    # Record a changed rectangle, clipped to the framebuffer
+    def mark_dirty(self, x, y, w, h):
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1, y1 = min(int(x + w), self.width), min(int(y + h), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        for i, (rx, ry, rw, rh) in enumerate(self.dirty):
+            if rx <= x0 and ry <= y0 and x1 <= rx + rw and y1 <= ry + rh:
+                return
+            if x0 <= rx and y0 <= ry and rx + rw <= x1 and ry + rh <= y1:
+                self.dirty[i] = (x0, y0, x1 - x0, y1 - y0)
+                return
+        self.dirty.append((x0, y0, x1 - x0, y1 - y0))
+        if len(self.dirty) > MAX_DIRTY_RECTS:
+            self.dirty = [_union(self.dirty)]
+
+    # Return the dirty rectangles and start tracking afresh
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, []
+        return dirty
+
+    def clear(self, color=0):
+        self[...] = color
+
+    # Copy the dirty regions to a pygame surface of the same size and return
+    # their rectangles for pygame.display.update
+    def present(self, surface):
+        import pygame
+
+        rects = self.take_dirty()
+        target = pygame.surfarray.pixels3d(surface)
+        for x, y, w, h in rects:
+            region = self.pixels[y:y + h, x:x + w]
+            if self.channels == 1:
+                region = region[..., None]
+            elif self.channels == 4:
+                region = region[..., :3]
+            target[x:x + w, y:y + h] = region.swapaxes(0, 1)
+        del target
+        return [pygame.Rect(rect) for rect in rects]
+
+    # Write the frame as binary PGM/PPM straight from the pixel memory.
+    # Frames can be written back to back to one stream (e.g. an ffmpeg pipe).
+    def write_ppm(self, stream):
+        pixels = self.pixels if self.channels != 4 else self.pixels[..., :3]
+        magic = b'P5' if self.channels == 1 else b'P6'
+        stream.write(b'%s\n%d %d\n255\n' % (magic, self.width, self.height))
+        if pixels.flags.c_contiguous:
+            stream.write(memoryview(pixels).cast('B'))
+        else:
+            for row in pixels:
+                stream.write(row.tobytes())
+
+    # Write the frame as PNG, compressing one row at a time instead of
+    # building a filtered copy of the whole image
+    def write_png(self, stream, level=6):
+        color_type = {1: 0, 3: 2, 4: 6}[self.channels]
+        header = struct.pack('>IIBBBBB', self.width, self.height, 8, color_type, 0, 0, 0)
+        compressor = zlib.compressobj(level)
+        chunks = []
+        for row in self.pixels:
+            chunks.append(compressor.compress(b'\x00'))
+            chunks.append(compressor.compress(memoryview(np.ascontiguousarray(row)).cast('B')))
+        chunks.append(compressor.flush())
+
+        stream.write(b'\x89PNG\r\n\x1a\n')
+        _write_chunk(stream, b'IHDR', header)
+        _write_chunk(stream, b'IDAT', b''.join(chunks))
+        _write_chunk(stream, b'IEND', b'')
+
+    def save(self, path):
+        with open(path, 'wb') as stream:
+            if str(path).lower().endswith('.png'):
+                self.write_png(stream)
+            else:
+                self.write_ppm(stream)
+
+
+# (start, stop) covered by one index along an axis of size n, or None if empty
+def _axis_extent(index, n):
+    if isinstance(index, slice):
+        start, stop, step = index.indices(n)
+        picked = range(start, stop, step)
+        if not len(picked):
+            return None
+        return min(picked[0], picked[-1]), max(picked[0], picked[-1]) + 1
+    index = np.asarray(index)
+    if index.dtype == bool:
+        index = np.flatnonzero(index)
+    if not index.size:
+        return None
+    index = np.where(index < 0, index + n, index)
+    return int(index.min()), int(index.max()) + 1
+
+
+def _union(rects):
+    x0 = min(r[0] for r in rects)
+    y0 = min(r[1] for r in rects)
+    x1 = max(r[0] + r[2] for r in rects)
+    y1 = max(r[1] + r[3] for r in rects)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _write_chunk(stream, kind, data):
+    stream.write(struct.pack('>I', len(data)))
+    stream.write(kind)
+    stream.write(data)
+    stream.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+
+if __name__ == "__main__":
+    import pygame
+
+    from circle_raster import draw_circles
+    from line_raster import draw_lines
+
+    width, height = 800, 600
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption("Framebuffer with dirty rectangles")
+    frame = Framebuffer(width, height)
+    rng = np.random.default_rng(0)
+
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                x, y = event.pos
+                draw_circles(frame, [(x, y)], [20], (255, 200, 0), filled=True)
+                draw_lines(frame, [(x, y, *rng.integers(0, (width, height)))],
+                           (0, 160, 255))
+
+        pygame.display.update(frame.present(screen))
+        clock.tick(60)
+
+    pygame.quit()
@@ -0,0 +1,258 @@
+import numpy as np
+
+# Largest number of pixels generated in one vectorized pass when drawing
+# straight into a canvas, so a million long segments never need one huge array
+CHUNK_PIXELS = 1 << 22
+
+
+def _as_segments(segments):
+    return np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+
+
+# Number of pixels bresenham() emits for each segment
+def segment_lengths(segments):
+    segments = _as_segments(segments)
+    dx = np.abs(segments[:, 2] - segments[:, 0])
+    dy = np.abs(segments[:, 3] - segments[:, 1])
+    return np.maximum(dx, dy) + 1
+
+
+# Pixels of every segment, in the same order bresenham() visits them.
+# The decision variable p of the loop crosses zero exactly when the minor
+# axis has moved floor((2*d_minor*k + d_major) / (2*d_major)) times, so each
+# pixel can be computed directly from its step index k.
+def _segment_pixels(segments, lengths):
+    x1, y1, x2, y2 = segments.T
+    dx = np.abs(x2 - x1)
+    dy = np.abs(y2 - y1)
+    sx = np.where(x2 > x1, 1, -1)
+    sy = np.where(y2 > y1, 1, -1)
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    seg = np.repeat(np.arange(len(lengths)), lengths)
+    k = np.arange(offsets[-1], dtype=np.int64) - offsets[seg]
+
+    x_major = (dy <= dx)[seg]
+    major = np.maximum(dx, dy)[seg]
+    minor = np.minimum(dx, dy)[seg]
+    minor_steps = (2 * minor * k + major) // np.maximum(2 * major, 1)
+
+    xs = x1[seg] + sx[seg] * np.where(x_major, k, minor_steps)
+    ys = y1[seg] + sy[seg] * np.where(x_major, minor_steps, k)
+    return xs, ys, offsets
+
+
+# Pixels of every segment as the loop in DDA-algorithm.py places them.
+# The loop adds the increment once per step, so the positions are running
+# sums; segments of equal length are accumulated together as rows of one
+# array, which rounds exactly like the loop (round() halves to even, as rint).
+def _dda_pixels(segments, lengths):
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    xs = np.empty(offsets[-1], dtype=np.int64)
+    ys = np.empty(offsets[-1], dtype=np.int64)
+
+    for n in np.unique(lengths):
+        index = np.flatnonzero(lengths == n)
+        x1, y1, x2, y2 = segments[index].T
+        steps = max(int(n) - 1, 1)
+        slots = offsets[index][:, None] + np.arange(n)
+        for out, start, end in ((xs, x1, x2), (ys, y1, y2)):
+            path = np.empty((len(index), n), dtype=np.float64)
+            path[:, 0] = start
+            path[:, 1:] = ((end - start) / steps)[:, None]
+            out[slots] = np.rint(np.cumsum(path, axis=1))
+    return xs, ys, offsets
+
+
+_LINE_PIXELS = {'bresenham': _segment_pixels, 'dda': _dda_pixels}
+
+
+# Slices of segments whose pixel count stays under the chunk budget
+def _chunks(lengths, budget):
+    ends = np.cumsum(lengths)
+    start = 0
+    while start < len(lengths):
+        base = ends[start - 1] if start else 0
+        stop = int(np.searchsorted(ends, base + budget, side='right'))
+        stop = max(stop, start + 1)
+        yield slice(start, stop)
+        start = stop
+
+
+# Rasterize an (N, 4) array of x1, y1, x2, y2 endpoints.
+# Returns packed int32 xs, ys and offsets so that the pixels of segment i
+# are xs[offsets[i]:offsets[i + 1]], ys[offsets[i]:offsets[i + 1]].
+def bresenham_batch(segments):
+    segments = _as_segments(segments)
+    lengths = segment_lengths(segments)
+    xs, ys, offsets = _segment_pixels(segments, lengths)
+    return xs.astype(np.int32), ys.astype(np.int32), offsets
+
+
+# Same as bresenham_batch() with the pixels the DDA loop picks
+def dda_batch(segments):
+    segments = _as_segments(segments)
+    lengths = segment_lengths(segments)
+    xs, ys, offsets = _dda_pixels(segments, lengths)
+    return xs.astype(np.int32), ys.astype(np.int32), offsets
+
+
+# Rasterize an (N, 4) array of segments straight into canvas[y, x].
+# Works for (H, W) and (H, W, C) canvases; pixels off the canvas are dropped.
+# algorithm is 'bresenham' or 'dda'.
+def draw_lines(canvas, segments, color, chunk_pixels=CHUNK_PIXELS,
+               algorithm='bresenham'):
+    if algorithm not in _LINE_PIXELS:
+        raise ValueError(f"unknown line algorithm {algorithm!r}")
+    pixels = _LINE_PIXELS[algorithm]
+    segments = _as_segments(segments)
+    lengths = segment_lengths(segments)
+    height, width = canvas.shape[:2]
+
+    for part in _chunks(lengths, chunk_pixels):
+        xs, ys, _ = pixels(segments[part], lengths[part])
+        keep = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        canvas[ys[keep], xs[keep]] = color
+    return canvas
+
+
+# Expand horizontal spans y, x0..x1 (inclusive) into pixel arrays xs, ys
+def span_pixels(ys, x0s, x1s):
+    ys = np.asarray(ys, dtype=np.int64).ravel()
+    x0s = np.asarray(x0s, dtype=np.int64).ravel()
+    lengths = np.maximum(np.asarray(x1s, dtype=np.int64).ravel() - x0s + 1, 0)
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    span = np.repeat(np.arange(len(lengths)), lengths)
+    xs = x0s[span] + np.arange(lengths.sum()) - starts[span]
+    return xs, ys[span]
+
+
+# Fill horizontal spans canvas[y, x0..x1] (inclusive) for arrays of ys, x0s, x1s.
+# Spans are clipped to the canvas and expanded to pixels in bounded chunks.
+def draw_spans(canvas, ys, x0s, x1s, color, chunk_pixels=CHUNK_PIXELS):
+    height, width = canvas.shape[:2]
+    ys = np.asarray(ys, dtype=np.int64).ravel()
+    x0s = np.maximum(np.asarray(x0s, dtype=np.int64).ravel(), 0)
+    x1s = np.minimum(np.asarray(x1s, dtype=np.int64).ravel(), width - 1)
+    keep = (ys >= 0) & (ys < height) & (x0s <= x1s)
+    ys, x0s, x1s = ys[keep], x0s[keep], x1s[keep]
+
+    for part in _chunks(x1s - x0s + 1, chunk_pixels):
+        xs, rows = span_pixels(ys[part], x0s[part], x1s[part])
+        canvas[rows, xs] = color
+    return canvas
+
+
+# Anti-aliased (Xiaolin Wu) pixels of float segments, fully vectorized.
+# Returns xs, ys and the fractional coverage of each pixel.
+def _wu_pixels(segments, intensity):
+    x0, y0, x1, y1 = segments.T.copy()
+    steep = np.abs(y1 - y0) > np.abs(x1 - x0)
+    x0[steep], y0[steep] = y0[steep], x0[steep]
+    x1[steep], y1[steep] = y1[steep], x1[steep]
+    flip = x0 > x1
+    x0[flip], x1[flip] = x1[flip], x0[flip]
+    y0[flip], y1[flip] = y1[flip], y0[flip]
+
+    dx = x1 - x0
+    gradient = np.divide(y1 - y0, dx, out=np.ones_like(dx), where=dx != 0)
+
+    # First endpoint
+    xend1 = np.floor(x0 + 0.5)
+    yend1 = y0 + gradient * (xend1 - x0)
+    xgap1 = 1 - (x0 + 0.5 - np.floor(x0 + 0.5))
+    # Second endpoint
+    xend2 = np.floor(x1 + 0.5)
+    yend2 = y1 + gradient * (xend2 - x1)
+    xgap2 = x1 + 0.5 - np.floor(x1 + 0.5)
+
+    end_x = np.concatenate([xend1, xend1, xend2, xend2])
+    end_y = np.floor(np.concatenate([yend1, yend1, yend2, yend2]))
+    end_y[len(segments):2 * len(segments)] += 1
+    end_y[3 * len(segments):] += 1
+    frac1 = yend1 - np.floor(yend1)
+    frac2 = yend2 - np.floor(yend2)
+    end_w = np.concatenate([(1 - frac1) * xgap1, frac1 * xgap1,
+                            (1 - frac2) * xgap2, frac2 * xgap2])
+    end_steep = np.tile(steep, 4)
+    end_i = np.tile(intensity, 4)
+
+    # Interior columns between the two endpoint pixels
+    lengths = np.maximum(xend2 - xend1 - 1, 0).astype(np.int64)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    seg = np.repeat(np.arange(len(lengths)), lengths)
+    k = np.arange(offsets[-1]) - offsets[seg] + 1
+    intery = yend1[seg] + gradient[seg] * k
+    row = np.floor(intery)
+    frac = intery - row
+    mid_x = np.concatenate([xend1[seg] + k] * 2)
+    mid_y = np.concatenate([row, row + 1])
+    mid_w = np.concatenate([1 - frac, frac])
+    mid_steep = np.tile(steep[seg], 2)
+    mid_i = np.tile(intensity[seg], 2)
+
+    xs = np.concatenate([end_x, mid_x]).astype(np.int64)
+    ys = np.concatenate([end_y, mid_y]).astype(np.int64)
+    is_steep = np.concatenate([end_steep, mid_steep])
+    xs[is_steep], ys[is_steep] = ys[is_steep], xs[is_steep]
+    weights = np.concatenate([end_w, mid_w]) * np.concatenate([end_i, mid_i])
+    return xs, ys, weights
+
+
+# Accumulate anti-aliased coverage of an (N, 4) array of float segments into
+# a float32 (H, W) buffer. intensity is a scalar or one value per segment.
+# Call resolve_coverage() once per frame to turn the buffer into pixels.
+def draw_lines_aa(accum, segments, intensity=1.0, chunk_pixels=CHUNK_PIXELS):
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    intensity = np.broadcast_to(np.asarray(intensity, dtype=np.float64),
+                                (len(segments),))
+    height, width = accum.shape[:2]
+    dx = np.abs(segments[:, 2] - segments[:, 0])
+    dy = np.abs(segments[:, 3] - segments[:, 1])
+    lengths = 2 * (np.ceil(np.maximum(dx, dy)).astype(np.int64) + 2)
+
+    for part in _chunks(lengths, chunk_pixels):
+        xs, ys, weights = _wu_pixels(segments[part], intensity[part])
+        keep = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        np.add.at(accum, (ys[keep], xs[keep]), weights[keep].astype(accum.dtype))
+    return accum
+
+
+# Convert an accumulated coverage buffer to uint8, saturating at full coverage.
+# With color given, returns an (H, W, 3) image of color over background.
+def resolve_coverage(accum, color=None, background=(0, 0, 0), out=None):
+    coverage = np.clip(accum, 0.0, 1.0)
+    if color is None:
+        if out is None:
+            out = np.empty(accum.shape, dtype=np.uint8)
+        return np.rint(coverage * 255, out=out, casting='unsafe')
+    color = np.asarray(color, dtype=np.float32)
+    background = np.asarray(background, dtype=np.float32)
+    blended = background + coverage[..., None] * (color - background)
+    if out is None:
+        out = np.empty(blended.shape, dtype=np.uint8)
+    return np.rint(blended, out=out, casting='unsafe')
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    width, height = 1920, 1080
+    segments = np.column_stack([rng.integers(0, width, 200000),
+                                rng.integers(0, height, 200000),
+                                rng.integers(0, width, 200000),
+                                rng.integers(0, height, 200000)])
+    segments[:, 2:] = segments[:, :2] + (segments[:, 2:] - segments[:, :2]) // 20
+
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    start = time.perf_counter()
+    draw_lines(canvas, segments, 255)
+    elapsed = time.perf_counter() - start
+    pixels = int(segment_lengths(segments).sum())
+    print(f"{len(segments)} segments, {pixels} pixels in {elapsed:.3f}s "
+          f"({pixels / elapsed / 1e6:.1f} Mpixel/s)")
@@ -0,0 +1,235 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Experiment 2'))
+
+from circle_raster import draw_circles
+from ellipse_raster import draw_ellipses
+from fill_raster import fill_polygons
+from framebuffer import Framebuffer
+from line_raster import draw_lines
+
+# Headless renderer for job files of primitives.
+#
+# A JSON job file holds a list of jobs (or {"jobs": [...]}), each one image:
+#   {"output": "tile.png", "width": 256, "height": 256,
+#    "background": [255, 255, 255], "clip": [xmin, ymin, xmax, ymax],
+#    "primitives": [
+#      {"type": "line", "algorithm": "dda", "segments": [[x1, y1, x2, y2]]},
+#      {"type": "circle", "centers": [[x, y]], "radii": [r], "filled": true},
+#      {"type": "ellipse", "centers": [[x, y]], "rx": 40, "ry": 20, "angle": 30},
+#      {"type": "polygon", "polygons": [[[x, y], ...]], "rule": "nonzero"}]}
+# Every primitive takes an optional "color". "clip" limits all drawing of a
+# job to that window (inclusive); a primitive of type "clip" changes it for
+# the primitives after it.
+#
+# A CSV job file has one primitive per row with the columns
+#   output, width, height, type, color, coords
+# plus optional algorithm, filled, rule and background columns. color is
+# "r g b"; coords are space separated: x1 y1 x2 y2 for a line, cx cy r for a
+# circle, cx cy rx ry [angle] for an ellipse, x y x y ... for a polygon and
+# xmin ymin xmax ymax for a clip window. Rows with the same output form a job.
+
+DEFAULT_COLOR = (0, 0, 0)
+DEFAULT_BACKGROUND = (255, 255, 255)
+
+
+def _numbers(text):
+    return [float(v) for v in str(text).split()]
+
+
+def _flag(text):
+    return str(text).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _csv_primitive(row):
+    kind = row['type'].strip().lower()
+    coords = _numbers(row.get('coords', ''))
+    primitive = {'type': kind}
+    if row.get('color'):
+        primitive['color'] = [int(v) for v in _numbers(row['color'])]
+    if kind == 'line':
+        primitive['segments'] = [coords[:4]]
+        primitive['algorithm'] = row.get('algorithm') or 'bresenham'
+    elif kind == 'circle':
+        primitive.update(centers=[coords[:2]], radii=[coords[2]])
+    elif kind == 'ellipse':
+        primitive.update(centers=[coords[:2]], rx=coords[2], ry=coords[3],
+                         angle=coords[4] if len(coords) > 4 else 0.0)
+    elif kind == 'polygon':
+        primitive['polygons'] = [np.reshape(coords, (-1, 2)).tolist()]
+        primitive['rule'] = row.get('rule') or 'evenodd'
+    elif kind == 'clip':
+        primitive['window'] = coords[:4]
+    else:
+        raise ValueError(f"unknown primitive type {kind!r}")
+    if kind in ('circle', 'ellipse'):
+        primitive['filled'] = _flag(row.get('filled', ''))
+    return primitive
+
+
+# Read a .json or .csv job file into a list of job dictionaries
+def load_jobs(path):
+    with open(path, newline='') as stream:
+        if not str(path).lower().endswith('.csv'):
+            jobs = json.load(stream)
+            return jobs['jobs'] if isinstance(jobs, dict) else jobs
+
+        jobs = {}
+        for row in csv.DictReader(stream):
+            job = jobs.setdefault(row['output'], {
+                'output': row['output'],
+                'width': int(row['width']),
+                'height': int(row['height']),
+                'primitives': [],
+            })
+            if row.get('background'):
+                job['background'] = [int(v) for v in _numbers(row['background'])]
+            job['primitives'].append(_csv_primitive(row))
+        return list(jobs.values())
+
+
+# Radii of a circle or ellipse primitive, which must be finite and >= 0
+def _radii(primitive, key):
+    radii = np.asarray(primitive[key], dtype=np.float64)
+    if not np.all(np.isfinite(radii) & (radii >= 0)):
+        raise ValueError(f"{primitive['type']} {key} must be finite and non-negative, "
+                         f"got {primitive[key]!r}")
+    return radii.astype(np.int64)
+
+
+# Draw one primitive into canvas, whose pixel (0, 0) is at origin
+def draw_primitive(canvas, primitive, origin=(0, 0)):
+    kind = primitive['type']
+    color = primitive.get('color', DEFAULT_COLOR)
+    ox, oy = origin
+    if kind == 'line':
+        segments = np.asarray(primitive['segments'], dtype=np.int64).reshape(-1, 4)
+        draw_lines(canvas, segments - (ox, oy, ox, oy), color,
+                   algorithm=primitive.get('algorithm', 'bresenham'))
+    elif kind == 'circle':
+        centers = np.asarray(primitive['centers'], dtype=np.int64).reshape(-1, 2)
+        draw_circles(canvas, centers - (ox, oy), _radii(primitive, 'radii'), color,
+                     filled=primitive.get('filled', False))
+    elif kind == 'ellipse':
+        centers = np.asarray(primitive['centers'], dtype=np.int64).reshape(-1, 2)
+        draw_ellipses(canvas, centers - (ox, oy), _radii(primitive, 'rx'),
+                      _radii(primitive, 'ry'), color, angle=primitive.get('angle', 0.0),
+                      filled=primitive.get('filled', False))
+    elif kind == 'polygon':
+        polygons = [np.asarray(p, dtype=np.float64).reshape(-1, 2) - (ox, oy)
+                    for p in primitive['polygons']]
+        fill_polygons(canvas, polygons, color, rule=primitive.get('rule', 'evenodd'))
+    else:
+        raise ValueError(f"unknown primitive type {kind!r}")
+
+
+# The part of the frame a clip window (inclusive) leaves drawable
+def _clip_view(frame, window):
+    if window is None:
+        return frame, (0, 0)
+    xmin, ymin, xmax, ymax = (int(v) for v in window)
+    xmin, ymin = max(xmin, 0), max(ymin, 0)
+    return frame.pixels[ymin:max(ymax + 1, ymin), xmin:max(xmax + 1, xmin)], (xmin, ymin)
+
+
+# Render one job to its output file; returns (output, primitives, seconds).
+# A bad primitive (wrong values, missing keys or wrong types) raises
+# ValueError naming the job index and the primitive.
+def render_job(job, output_dir='.', index=None):
+    start = time.perf_counter()
+    frame = Framebuffer(int(job['width']), int(job['height']),
+                        background=job.get('background', DEFAULT_BACKGROUND))
+    canvas, origin = _clip_view(frame, job.get('clip'))
+    for number, primitive in enumerate(job['primitives']):
+        try:
+            if primitive['type'] == 'clip':
+                canvas, origin = _clip_view(frame, primitive.get('window'))
+            else:
+                draw_primitive(canvas, primitive, origin)
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"job {index} ({job.get('output')}), "
+                             f"primitive {number}: {_describe(error)}") from error
+
+    output = os.path.join(output_dir, job['output'])
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    frame.save(output)
+    return job['output'], len(job['primitives']), time.perf_counter() - start
+
+
+def _describe(error):
+    if isinstance(error, KeyError):
+        return f"missing key {error}"
+    if isinstance(error, ValueError):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+
+# Worker entry point: a job that is malformed or cannot be written is
+# reported, not raised, so one bad job does not take the rest of the batch
+# down with it
+def _render_job(args):
+    job, output_dir, index = args
+    try:
+        return render_job(job, output_dir, index) + (None,)
+    except (KeyError, TypeError, ValueError, OSError) as error:
+        job = job if isinstance(job, dict) else {}
+        message = _describe(error)
+        if not message.startswith(f"job {index} "):
+            message = f"job {index} ({job.get('output')}): {message}"
+        primitives = job.get('primitives')
+        count = len(primitives) if isinstance(primitives, list) else 0
+        return job.get('output'), count, 0.0, message
+
+
+# Print each finished job and gather its timing
+def _collect(outputs):
+    results = []
+    for output, count, seconds, error in outputs:
+        if error is not None:
+            results.append({'output': output, 'primitives': count, 'error': error})
+            print(f"{output}: failed: {error}", file=sys.stderr)
+            continue
+        results.append({'output': output, 'primitives': count, 'seconds': seconds})
+        print(f"{output}: {count} primitives in {seconds * 1000:.2f} ms")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render primitive job files to images.")
+    parser.add_argument('jobs', nargs='+', help=".json or .csv job files")
+    parser.add_argument('-o', '--output-dir', default='.')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help="worker processes (1 renders in this process)")
+    parser.add_argument('--report', help="write per-job timings to this JSON file")
+    args = parser.parse_args(argv)
+
+    jobs = [job for path in args.jobs for job in load_jobs(path)]
+    tasks = [(job, args.output_dir, index) for index, job in enumerate(jobs)]
+    start = time.perf_counter()
+    if args.workers == 1:
+        results = _collect(map(_render_job, tasks))
+    else:
+        workers = args.workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk = max(1, len(tasks) // (4 * workers))
+            results = _collect(executor.map(_render_job, tasks, chunksize=chunk))
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(results)} jobs in {elapsed:.3f}s "
+          f"({len(results) / max(elapsed, 1e-9) * 3600:.0f} jobs/hour)")
+    if args.report:
+        with open(args.report, 'w') as stream:
+            json.dump({'jobs': results, 'seconds': elapsed}, stream, indent=2)
+    return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
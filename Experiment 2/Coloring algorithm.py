@@ -1,10 +1,17 @@
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import numpy as np
-from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Experiment 1'))
+
+from fill_raster import flood_fill
+from framebuffer import Framebuffer
 
 
 width, height = 300, 300
-canvas = np.ones((height, width, 3), dtype=np.uint8) * 255
+canvas = Framebuffer(width, height, background=255)
 
 
 def draw_polygon(vertices):
@@ -43,28 +50,9 @@ def bresenham_line(x1, y1, x2, y2):
 
 
 def flood_fill_iter(x, y, target_color, fill_color):
-    target = np.array(target_color, dtype=np.uint8)
-    fill = np.array(fill_color, dtype=np.uint8)
-
-    if np.array_equal(canvas[y, x], fill) or not np.array_equal(canvas[y, x], target):
+    if not np.array_equal(canvas[y, x], target_color):
         return
-
-    queue = deque()
-    queue.append((x, y))
-
-    while queue:
-        cx, cy = queue.popleft()
-        if cx < 0 or cx >= width or cy < 0 or cy >= height:
-            continue
-        if not np.array_equal(canvas[cy, cx], target):
-            continue
-
-        canvas[cy, cx] = fill
-
-        queue.append((cx + 1, cy))
-        queue.append((cx - 1, cy))
-        queue.append((cx, cy + 1))
-        queue.append((cx, cy - 1))
+    flood_fill(canvas, x, y, fill_color, target_color)
 
 
 vertices = [(50, 50), (250, 50), (250, 250), (50, 200)]
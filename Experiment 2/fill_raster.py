@@ -0,0 +1,186 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Experiment 1'))
+
+from line_raster import draw_spans
+
+
+# Pack an (H, W, 3) or (H, W, 4) uint8 canvas into one uint32 per pixel so a
+# whole row compares in one operation. 4-channel canvases are viewed in place
+# (strided ones through a contiguous copy), so every channel takes part and a
+# colour packed by _pack_color() compares equal.
+def packed_view(canvas):
+    if canvas.ndim == 2:
+        return canvas.astype(np.uint32, copy=False)
+    if canvas.shape[2] == 4:
+        return np.ascontiguousarray(canvas).view(np.uint32)[..., 0]
+    packed = canvas[..., 0].astype(np.uint32) << 16
+    packed |= canvas[..., 1].astype(np.uint32) << 8
+    packed |= canvas[..., 2]
+    return packed
+
+
+def _pack_color(color):
+    color = np.asarray(color, dtype=np.uint8).reshape(1, 1, -1)
+    if color.shape[2] == 1:
+        return packed_view(color[..., 0])[0, 0]
+    return packed_view(np.ascontiguousarray(color))[0, 0]
+
+
+# Pixels that belong to the region: equal to target, or every channel within
+# tolerance of it
+def _match_mask(canvas, target, tolerance):
+    if tolerance <= 0:
+        return packed_view(canvas) == _pack_color(target)
+    target = np.asarray(target, dtype=np.int16)
+    diff = np.abs(canvas.astype(np.int16) - target)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    return diff <= tolerance
+
+
+# Maximal runs of matching pixels in every row, sorted by row then x.
+# Returns rows, starts, ends (inclusive) and where each row's runs begin.
+def _row_runs(mask):
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    first = np.searchsorted(rows, np.arange(height + 1))
+    return rows, starts, ends - 1, first
+
+
+# Scanline seed fill: walks whole runs instead of pixels, so the Python work
+# grows with the number of runs in the region, not its area.
+# Returns the filled spans as ys, x0s, x1s (x1 inclusive).
+def flood_spans(canvas, x, y, target_color=None, tolerance=0, connectivity=4):
+    if connectivity not in (4, 8):
+        raise ValueError("connectivity must be 4 or 8")
+    height, width = canvas.shape[:2]
+    empty = np.empty(0, dtype=np.int64)
+    if not (0 <= x < width and 0 <= y < height):
+        return empty, empty, empty
+    if target_color is None:
+        target_color = canvas[y, x]
+
+    mask = _match_mask(canvas, target_color, tolerance)
+    if not mask[y, x]:
+        return empty, empty, empty
+    rows, starts, ends, first = _row_runs(mask)
+    reach = 1 if connectivity == 8 else 0
+
+    seed = first[y] + int(np.searchsorted(ends[first[y]:first[y + 1]], x))
+    visited = np.zeros(len(rows), dtype=bool)
+    visited[seed] = True
+    stack = [seed]
+    while stack:
+        run = stack.pop()
+        row, x0, x1 = rows[run], starts[run] - reach, ends[run] + reach
+        for ny in (row - 1, row + 1):
+            if ny < 0 or ny >= height:
+                continue
+            lo, hi = first[ny], first[ny + 1]
+            # Runs of the neighbour row that overlap x0..x1
+            i = lo + int(np.searchsorted(ends[lo:hi], x0))
+            stop = lo + int(np.searchsorted(starts[lo:hi], x1, side='right'))
+            for j in range(i, stop):
+                if not visited[j]:
+                    visited[j] = True
+                    stack.append(j)
+
+    return rows[visited], starts[visited], ends[visited]
+
+
+# Fill the region connected to (x, y) with fill_color. target_color defaults
+# to the colour under the seed; tolerance is the largest per-channel difference
+# still treated as part of the region.
+def flood_fill(canvas, x, y, fill_color, target_color=None, tolerance=0,
+               connectivity=4):
+    height, width = canvas.shape[:2]
+    if not (0 <= x < width and 0 <= y < height):
+        return canvas
+    if target_color is None:
+        target_color = canvas[y, x]
+    if tolerance <= 0 and _pack_color(fill_color) == _pack_color(target_color):
+        return canvas
+    ys, x0s, x1s = flood_spans(canvas, x, y, target_color, tolerance, connectivity)
+    return draw_spans(canvas, ys, x0s, x1s, fill_color)
+
+
+# Accept one vertices list or a list of them; returns the packed vertices and
+# the offset of every polygon's first vertex
+def _as_polygons(polygons):
+    if len(polygons) and np.ndim(polygons[0]) == 1 and len(polygons[0]) == 2:
+        polygons = [polygons]
+    counts = np.array([len(p) for p in polygons], dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    if not offsets[-1]:
+        return np.empty((0, 2)), offsets
+    points = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2)
+                             for p in polygons if len(p)])
+    return points, offsets
+
+
+# Scanline fill of polygons given as vertices lists, sampled at pixel centres.
+# Every non-horizontal edge is entered in the edge table for the rows it
+# crosses; sorting the crossings by (polygon, row, x) yields each row's active
+# edge list, and the running winding number decides which gaps are inside.
+# rule is 'evenodd' or 'nonzero'. Returns ys, x0s, x1s (x1 inclusive).
+def polygon_spans(polygons, rule='evenodd'):
+    if rule not in ('evenodd', 'nonzero'):
+        raise ValueError("rule must be 'evenodd' or 'nonzero'")
+    points, offsets = _as_polygons(polygons)
+    index = np.arange(len(points))
+    following = index + 1
+    closed = offsets[1:] > offsets[:-1]
+    following[offsets[1:][closed] - 1] = offsets[:-1][closed]
+    polygon = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+    x0, y0 = points[index].T
+    x1, y1 = points[following].T
+    direction = np.sign(y1 - y0).astype(np.int64)
+    edge = direction != 0
+    x0, y0, x1, y1 = x0[edge], y0[edge], x1[edge], y1[edge]
+    direction, polygon = direction[edge], polygon[edge]
+
+    # Rows whose centre y + 0.5 lies in [min(y0, y1), max(y0, y1))
+    first = np.ceil(np.minimum(y0, y1) - 0.5).astype(np.int64)
+    counts = np.maximum(np.ceil(np.maximum(y0, y1) - 0.5).astype(np.int64) - first, 0)
+    starts = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+    e = np.repeat(np.arange(len(counts)), counts)
+    rows = first[e] + np.arange(counts.sum()) - starts[e]
+    xs = x0[e] + (rows + 0.5 - y0[e]) * (x1[e] - x0[e]) / (y1[e] - y0[e])
+
+    # Only the pixel boundary ceil(x - 0.5) of a crossing matters, and ties
+    # only produce empty spans, so one integer key orders the whole table
+    bounds = np.ceil(xs - 0.5).astype(np.int64)
+    direction = direction[e]
+    if len(bounds):
+        row_span = rows.max() - rows.min() + 1
+        x_span = bounds.max() - bounds.min() + 1
+        key = ((polygon[e] * row_span + rows - rows.min()) * x_span
+               + bounds - bounds.min())
+        order = np.argsort(key)
+        rows, bounds, direction = rows[order], bounds[order], direction[order]
+    # Each row of a closed polygon has zero net winding, so one running sum
+    # over all rows never leaks between rows or polygons
+    if rule == 'nonzero':
+        inside = np.cumsum(direction) != 0
+    else:
+        inside = np.arange(1, len(bounds) + 1) % 2 == 1
+
+    left, right = bounds[:-1], bounds[1:] - 1
+    span = inside[:-1] & (left <= right)
+    return rows[:-1][span], left[span], right[span]
+
+
+# Fill one vertices list, or many of them, straight into canvas[y, x]
+def fill_polygons(canvas, polygons, color, rule='evenodd'):
+    return draw_spans(canvas, *polygon_spans(polygons, rule), color)
@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from transform2d import Transform2D
+
 # Draw a closed shape and label it
 def draw_shape(points, label, color):
     x, y = zip(*points)
@@ -8,42 +10,30 @@ def draw_shape(points, label, color):
     y += (y[0],)
     plt.plot(x, y, color=color, label=label)
 
-# Translation matrix
+# Translation
 def translate(points, tx, ty):
-    T = np.array([[1, 0, tx],
-                  [0, 1, ty],
-                  [0, 0, 1]])
-    return apply_transform(points, T)
+    return apply_transform(points, Transform2D().translate(tx, ty))
 
-# Scaling matrix
+# Scaling
 def scale(points, sx, sy):
-    S = np.array([[sx, 0, 0],
-                  [0, sy, 0],
-                  [0, 0, 1]])
-    return apply_transform(points, S)
+    return apply_transform(points, Transform2D().scale(sx, sy))
 
-# Rotation matrix
+# Rotation
 def rotate(points, angle_deg):
-    angle_rad = np.radians(angle_deg)
-    R = np.array([[np.cos(angle_rad), -np.sin(angle_rad), 0],
-                  [np.sin(angle_rad),  np.cos(angle_rad), 0],
-                  [0, 0, 1]])
-    return apply_transform(points, R)
-
-# Apply transformation matrix to each point
-def apply_transform(points, matrix):
-    transformed = []
-    for x, y in points:
-        vec = np.array([x, y, 1])
-        result = matrix @ vec
-        transformed.append((result[0], result[1]))
-    return transformed
+    return apply_transform(points, Transform2D().rotate(angle_deg))
+
+# Apply a transform to all points in one matmul
+def apply_transform(points, transform):
+    transformed = transform.apply(np.asarray(points, dtype=np.float64))
+    return [tuple(p) for p in transformed.tolist()]
 # Original triangle
 triangle = [(0, 0), (100, 0), (50, 80)]
 
 translated = translate(triangle, 120, 50)
 scaled = scale(triangle, 1.5, 1.5)
 rotated = rotate(triangle, 45)
+# Scale, rotate and translate composed into one matrix and applied in one pass
+composed = apply_transform(triangle, Transform2D().scale(1.5, 1.5).rotate(45).translate(120, 50))
 
 # Plot
 plt.figure(figsize=(8, 8))
@@ -51,6 +41,7 @@ draw_shape(triangle, "Original", 'blue')
 draw_shape(translated, "Translated", 'green')
 draw_shape(scaled, "Scaled", 'orange')
 draw_shape(rotated, "Rotated", 'red')
+draw_shape(composed, "Scaled, rotated and translated", 'purple')
 plt.title("2D Transformations")
 plt.legend()
 plt.grid(True)
@@ -0,0 +1,274 @@
+import argparse
+import ast
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from collections import deque
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'Experiment 1'))
+sys.path.append(os.path.join(ROOT, 'Experiment 2'))
+sys.path.append(os.path.join(ROOT, 'Exp4'))
+
+from circle_raster import circle_pixels, draw_circles
+from clipping import clip_polygons, clip_segments, pack_polygons
+from ellipse_raster import draw_ellipses, ellipse_quadrant
+from fill_raster import fill_polygons, flood_fill
+from line_raster import bresenham_batch, dda_batch
+
+# Benchmarks for the 2D raster and clipping kernels.
+#
+#   python benchmarks/bench_2d.py --save baseline.json
+#   python benchmarks/bench_2d.py --compare baseline.json --threshold 0.1
+#
+# Every case reports its work in pixels or primitives per second. With
+# --compare the run exits with status 1 when any case is slower than the
+# baseline by more than the threshold.
+
+REGRESSION_THRESHOLD = 0.10
+MIN_SECONDS = 0.2
+
+
+# Load function definitions from one of the experiment scripts without
+# running the script itself (they block on input() or open a window).
+# Names the functions read as globals are taken from the keyword arguments.
+def script_functions(path, *names, **namespace):
+    with open(os.path.join(ROOT, path)) as stream:
+        tree = ast.parse(stream.read(), path)
+    body = [node for node in tree.body
+            if isinstance(node, ast.FunctionDef) and node.name in names]
+    namespace.setdefault('np', np)
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, 'exec'), namespace)
+    return namespace
+
+
+def _segments(rng, n, length):
+    start = rng.integers(0, 1000, (n, 2))
+    angle = rng.random(n) * 2 * np.pi
+    end = start + np.rint(length * np.column_stack([np.cos(angle), np.sin(angle)]))
+    end = np.clip(end, 0, 999)
+    return np.column_stack([start, end]).astype(np.int64)
+
+
+def _polygons(rng, n, vertices, radius, extent=1000):
+    centers = rng.random((n, 1, 2)) * extent
+    angle = np.sort(rng.random((n, vertices)) * 2 * np.pi, axis=1)
+    r = radius * (0.5 + rng.random((n, vertices)))
+    return centers + np.stack([r * np.cos(angle), r * np.sin(angle)], axis=2)
+
+
+# Every case returns (function to time, units of work per call, unit name)
+def line_cases(rng):
+    for label, length, n in (('short', 8, 20000), ('long', 500, 400)):
+        segments = _segments(rng, n, length)
+        pixels = int((np.abs(segments[:, 2:] - segments[:, :2]).max(axis=1) + 1).sum())
+        yield f'dda_batch[{label}]', (lambda s=segments: dda_batch(s)), pixels, 'pixels'
+        yield (f'bresenham_batch[{label}]', (lambda s=segments: bresenham_batch(s)),
+               pixels, 'pixels')
+
+        few = segments[:max(1, n // 20)]
+        few_pixels = int((np.abs(few[:, 2:] - few[:, :2]).max(axis=1) + 1).sum())
+        scalar = script_functions('Experiment 1/Bresenhem-Algorithm.py', 'bresenham',
+                                  print=lambda *args, **kwargs: None)['bresenham']
+        yield (f'bresenham[{label}]',
+               (lambda s=few: [scalar(*map(int, seg)) for seg in s]), few_pixels, 'pixels')
+
+        canvas = np.zeros((1000, 1000, 3), dtype=np.uint8)
+        coloring = script_functions('Experiment 2/Coloring algorithm.py', 'bresenham_line',
+                                    canvas=canvas)['bresenham_line']
+        yield (f'bresenham_line[{label}]',
+               (lambda s=few: [coloring(*map(int, seg)) for seg in s]), few_pixels, 'pixels')
+
+
+def circle_cases(rng):
+    canvas = np.zeros((1000, 1000, 3), dtype=np.uint8)
+    for label, r, n in (('small', 4, 20000), ('large', 300, 50)):
+        centers = rng.integers(0, 1000, (n, 2))
+        pixels = len(circle_pixels(centers, r)[0])
+        yield f'circle_pixels[{label}]', (lambda c=centers, r=r: circle_pixels(c, r)), pixels, 'pixels'
+        yield (f'draw_circles_filled[{label}]',
+               (lambda c=centers, r=r: draw_circles(canvas, c, r, 255, filled=True)),
+               n * int(np.pi * r * r), 'pixels')
+
+
+def ellipse_cases(rng):
+    canvas = np.zeros((1000, 1000, 3), dtype=np.uint8)
+    midpoint = ellipse_quadrant.__wrapped__
+    for label, rx, ry, n in (('small', 6, 3, 20000), ('large', 400, 250, 50)):
+        quadrant = 4 * len(midpoint(rx, ry)[0])
+        yield (f'midpoint_ellipse[{label}]', (lambda rx=rx, ry=ry: midpoint(rx, ry)),
+               quadrant, 'pixels')
+        centers = rng.integers(0, 1000, (n, 2))
+        yield (f'draw_ellipses[{label}]',
+               (lambda c=centers, rx=rx, ry=ry: draw_ellipses(canvas, c, rx, ry, 255)),
+               n * quadrant, 'pixels')
+        yield (f'draw_ellipses_rotated[{label}]',
+               (lambda c=centers, rx=rx, ry=ry: draw_ellipses(canvas, c, rx, ry, 255,
+                                                              angle=30, filled=True)),
+               n * int(np.pi * rx * ry), 'pixels')
+
+
+# The per-pixel BFS flood fill that Coloring algorithm.py used before the
+# scanline span fill, kept as the baseline for the fill cases
+def bfs_flood_fill(canvas, x, y, target_color, fill_color):
+    height, width = canvas.shape[:2]
+    target = np.array(target_color, dtype=np.uint8)
+    fill = np.array(fill_color, dtype=np.uint8)
+
+    if np.array_equal(canvas[y, x], fill) or not np.array_equal(canvas[y, x], target):
+        return
+
+    queue = deque()
+    queue.append((x, y))
+
+    while queue:
+        cx, cy = queue.popleft()
+        if cx < 0 or cx >= width or cy < 0 or cy >= height:
+            continue
+        if not np.array_equal(canvas[cy, cx], target):
+            continue
+
+        canvas[cy, cx] = fill
+
+        queue.append((cx + 1, cy))
+        queue.append((cx - 1, cy))
+        queue.append((cx, cy + 1))
+        queue.append((cx, cy - 1))
+
+
+def fill_cases(rng):
+    size = 300
+    canvas = np.full((size, size, 3), 255, dtype=np.uint8)
+
+    def bfs(canvas=canvas):
+        canvas[...] = 255
+        bfs_flood_fill(canvas, 1, 1, [255, 255, 255], [255, 0, 0])
+    yield f'flood_fill_bfs[{size}]', bfs, size * size, 'pixels'
+
+    # The demo's flood_fill_iter(), which now delegates to the span fill
+    coloring = script_functions('Experiment 2/Coloring algorithm.py', 'flood_fill_iter',
+                                canvas=canvas, flood_fill=flood_fill)['flood_fill_iter']
+
+    def demo(canvas=canvas):
+        canvas[...] = 255
+        coloring(1, 1, [255, 255, 255], [255, 0, 0])
+    yield f'flood_fill_iter_scanline[{size}]', demo, size * size, 'pixels'
+
+    for size in (1000, 2000):
+        canvas = np.full((size, size, 3), 255, dtype=np.uint8)
+
+        def scanline(canvas=canvas):
+            canvas[...] = 255
+            flood_fill(canvas, 1, 1, (255, 0, 0))
+        yield f'flood_fill[{size}]', scanline, size * size, 'pixels'
+
+    canvas = np.zeros((1000, 1000), dtype=np.uint8)
+    for label, n, vertices, radius in (('sparse', 20, 6, 200), ('dense', 5000, 12, 8)):
+        polygons = list(_polygons(rng, n, vertices, radius))
+        yield (f'fill_polygons[{label}]',
+               (lambda p=polygons: fill_polygons(canvas, p, 255)), n, 'polygons')
+
+
+def clip_cases(rng):
+    window = (200, 200, 800, 800)
+    clipping = script_functions('Exp4/exp4_polygon_clipping.py',
+                                'cohen_sutherland_line_clip', 'sutherland_hodgman_clip')
+    cohen = clipping['cohen_sutherland_line_clip']
+    hodgman = clipping['sutherland_hodgman_clip']
+    plain = script_functions('Exp4.py', 'inside', 'intersect', 'clip_polygon',
+                             LEFT=0, RIGHT=1, BOTTOM=2, TOP=3)['clip_polygon']
+
+    segments = _segments(rng, 5000, 300).tolist()
+    yield ('cohen_sutherland',
+           (lambda: [cohen(*seg, *window) for seg in segments]), len(segments), 'segments')
+    many = _segments(rng, 1_000_000, 300).astype(np.float64)
+    yield ('clip_segments',
+           (lambda: clip_segments(many, window)), len(many), 'segments')
+    for label, n, vertices in (('sparse', 500, 5), ('dense', 20, 200)):
+        polygons = [[tuple(p) for p in polygon]
+                    for polygon in _polygons(rng, n, vertices, 250).tolist()]
+        yield (f'sutherland_hodgman[{label}]',
+               (lambda p=polygons: [hodgman(q, window) for q in p]), n, 'polygons')
+        yield (f'clip_polygon[{label}]',
+               (lambda p=polygons: [plain(q, (200, 800, 200, 800)) for q in p]), n, 'polygons')
+        packed = pack_polygons(polygons)
+        yield (f'clip_polygons[{label}]',
+               (lambda p=packed: clip_polygons(*p, window)), n, 'polygons')
+
+
+CASES = [line_cases, circle_cases, ellipse_cases, fill_cases, clip_cases]
+
+
+# Best time of one call, each measurement running at least MIN_SECONDS
+def measure(function, repeat=3, min_seconds=MIN_SECONDS):
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_seconds or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_seconds / elapsed) + 1)
+    times = [elapsed] + timer.repeat(repeat - 1, number)
+    return min(times) / number
+
+
+def run(pattern=None, repeat=3, min_seconds=MIN_SECONDS):
+    rng = np.random.default_rng(0)
+    results = {}
+    for cases in CASES:
+        for name, function, units, unit in cases(rng):
+            if pattern and pattern not in name:
+                continue
+            seconds = measure(function, repeat, min_seconds)
+            results[name] = {'seconds': seconds, 'units': units, 'unit': unit,
+                             'rate': units / seconds}
+            print(f"{name:36s} {seconds * 1000:10.3f} ms  {units / seconds:14,.0f} {unit}/s")
+    return results
+
+
+# Cases whose rate dropped by more than threshold against the baseline
+def regressions(results, baseline, threshold=REGRESSION_THRESHOLD):
+    slower = {}
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and result['rate'] < before['rate'] * (1 - threshold):
+            slower[name] = result['rate'] / before['rate'] - 1
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the 2D raster kernels.")
+    parser.add_argument('-k', '--filter', help="only run cases whose name contains this")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS)
+    parser.add_argument('--save', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to check for regressions")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="largest allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat, args.min_seconds)
+    if args.save:
+        with open(args.save, 'w') as stream:
+            json.dump({'python': platform.python_version(), 'numpy': np.__version__,
+                       'machine': platform.machine(), 'time': time.time(),
+                       'results': results}, stream, indent=2)
+
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)['results']
+        slower = regressions(results, baseline, args.threshold)
+        for name, change in sorted(slower.items()):
+            print(f"REGRESSION {name}: {change:+.1%}")
+        if slower:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
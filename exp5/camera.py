@@ -0,0 +1,154 @@
+import numpy as np
+
+# Pinhole camera for the 3D demos: world space -> view space -> screen pixels.
+#
+# View space is left-handed like the scenes of exp5 and exp6: x right, y up
+# and z pointing away from the camera, so a view-space z is the depth.
+# Screen y grows downwards. The default camera sits at z = -5 looking at the
+# origin, which is the `z + distance` of the old project_to_2d loops.
+
+
+def _normalize(v):
+    norm = np.linalg.norm(v)
+    return v if norm == 0 else v / norm
+
+
+# World -> view matrix of a camera at eye looking at target
+def look_at(eye, target, up=(0, 1, 0)):
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = _normalize(np.asarray(target, dtype=np.float64) - eye)
+    right = _normalize(np.cross(up, forward))
+    true_up = np.cross(forward, right)
+    view = np.eye(4)
+    view[:3, :3] = right, true_up, forward
+    view[:3, 3] = -view[:3, :3] @ eye
+    return view
+
+
+# View -> screen matrix for a focal length in pixels. The third row is the
+# depth w; a view point p lands on (row0 . p, row1 . p) / w.
+def perspective(focal, width, height):
+    return np.array([[focal, 0, width / 2, 0],
+                     [0, -focal, height / 2, 0],
+                     [0, 0, 1, 0]], dtype=np.float64)
+
+
+# Projects whole vertex arrays in one pass:
+#   camera = Camera(800, 600, focal=300)
+#   screen = camera.project(vertices, out=screen)
+# focal is in pixels; without it the focal length follows from the vertical
+# field of view fov in degrees. Points closer than near are projected as if
+# they were on the near plane, so the divide never blows up; edges crossing
+# the near plane are cut at it by project_edges().
+class Camera:
+    def __init__(self, width, height, focal=None, fov=60.0, near=0.1,
+                 eye=(0, 0, -5), target=(0, 0, 0), up=(0, 1, 0)):
+        self.near = near
+        self.fov = fov
+        self._focal = focal
+        self._scratch = np.empty((0, 3))
+        self.resize(width, height)
+        self.look_at(eye, target, up)
+
+    def resize(self, width, height):
+        self.width, self.height = width, height
+        focal = self._focal
+        if focal is None:
+            focal = height / 2 / np.tan(np.radians(self.fov) / 2)
+        self.projection = perspective(focal, width, height)
+        self._matrix = None
+
+    def look_at(self, eye, target=(0, 0, 0), up=(0, 1, 0)):
+        self.eye = np.asarray(eye, dtype=np.float64)
+        self.view = look_at(eye, target, up)
+        self._matrix = None
+
+    # The combined 3x4 world -> screen matrix, rebuilt only after the camera
+    # moved or the screen changed size
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            self._matrix = self.projection @ self.view
+        return self._matrix
+
+    # Homogeneous screen coordinates (x * w, y * w, w) of (N, 3) points, in a
+    # scratch buffer that is reused while the vertex count does not grow
+    def _clip(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(self._scratch) < len(points):
+            self._scratch = np.empty((len(points), 3))
+        clip = self._scratch[:len(points)]
+        np.matmul(points, self.matrix[:, :3].T, out=clip)
+        clip += self.matrix[:, 3]
+        return clip
+
+    # View-space depth of every point, into out when given
+    def depth(self, points, out=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        out = np.matmul(points, self.view[2, :3], out=out)
+        out += self.view[2, 3]
+        return out
+
+    # Screen positions of (N, 3) points as an (N, 2) array. The result goes
+    # into out when given, else into a new array of dtype; integer results
+    # are rounded to the nearest pixel.
+    def project(self, points, out=None, dtype=np.int32):
+        clip = self._clip(points)
+        if out is None:
+            out = np.empty((len(clip), 2), dtype=dtype)
+        return self._divide(clip, out)
+
+    def _divide(self, clip, out):
+        w = clip[:, 2:]
+        np.maximum(w, self.near, out=w)
+        xy = clip[:, :2]
+        xy /= w
+        if out.dtype.kind in 'iu':
+            np.rint(xy, out=xy)
+        out[...] = xy
+        return out
+
+    # Screen segments (E, 4) of the edges (E, 2 vertex indices) of a
+    # wireframe, and which of them are visible. An edge with one end behind
+    # the near plane is cut where it crosses it; an edge with both ends
+    # behind it is not visible and its row is left at zero.
+    def project_edges(self, points, edges, out=None, dtype=np.int32):
+        clip = self._clip(points)
+        edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+        if out is None:
+            out = np.empty((len(edges), 4), dtype=dtype)
+        a, b = clip[edges[:, 0]], clip[edges[:, 1]]
+        wa, wb = a[:, 2], b[:, 2]
+        visible = (wa >= self.near) | (wb >= self.near)
+
+        # Homogeneous coordinates are linear in view space, so the crossing
+        # is found before the divide
+        crossing = np.flatnonzero(visible & ((wa < self.near) | (wb < self.near)))
+        if len(crossing):
+            sa, sb = a[crossing], b[crossing]
+            t = (self.near - sa[:, 2]) / (sb[:, 2] - sa[:, 2])
+            cut = sa + t[:, None] * (sb - sa)
+            behind_a = sa[:, 2] < self.near
+            a[crossing[behind_a]] = cut[behind_a]
+            b[crossing[~behind_a]] = cut[~behind_a]
+
+        self._divide(a, out[:, :2])
+        self._divide(b, out[:, 2:])
+        out[~visible] = 0
+        return out, visible
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    vertices = rng.random((1_000_000, 3)) * 4 - 2
+    camera = Camera(800, 600, focal=300)
+    screen = np.empty((len(vertices), 2), dtype=np.int32)
+
+    camera.project(vertices, out=screen)
+    start = time.perf_counter()
+    for _ in range(10):
+        camera.project(vertices, out=screen)
+    print(f"{len(vertices)} vertices in "
+          f"{(time.perf_counter() - start) * 100:.1f} ms per frame")
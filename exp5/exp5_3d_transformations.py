@@ -1,82 +1,55 @@
 import pygame
 import numpy as np
-import math
 import sys
 
+from camera import Camera
+from frame_timing import FrameTimer
+from hud import HudPanel, draw_text
+from input_replay import demo_options, input_source
+import transform3d
+
 class Object3D:
     def __init__(self, vertices, edges):
-        self.original_vertices = np.array(vertices)
-        self.vertices = np.copy(self.original_vertices)
-        self.edges = edges
+        self.original_vertices = np.array(vertices, dtype=float)
+        self.edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+        # Transforms only update the model matrix; the vertices are
+        # recomputed from the originals once, the next time they are read
+        self.model = np.eye(4)
+        self._vertices = None
+        # Projection buffers, filled in place every frame
+        self.screen_points = np.empty((len(self.original_vertices), 2), dtype=np.int32)
+        self.screen_segments = np.empty((len(self.edges), 4), dtype=np.int32)
+        self.depths = np.empty(len(self.original_vertices))
+        self.in_front = np.empty(len(self.original_vertices), dtype=bool)
     
     def translate(self, dx, dy, dz):
-        translation_matrix = np.array([
-            [1, 0, 0, dx],
-            [0, 1, 0, dy],
-            [0, 0, 1, dz],
-            [0, 0, 0, 1]
-        ])
-        self.apply_transformation(translation_matrix)
+        self.apply_transformation(transform3d.translation(dx, dy, dz))
     
     def scale(self, sx, sy, sz):
-        scale_matrix = np.array([
-            [sx, 0, 0, 0],
-            [0, sy, 0, 0],
-            [0, 0, sz, 0],
-            [0, 0, 0, 1]
-        ])
-        self.apply_transformation(scale_matrix)
+        self.apply_transformation(transform3d.scaling(sx, sy, sz))
     
     def rotate_x(self, angle):
-        cos_a, sin_a = math.cos(angle), math.sin(angle)
-        rotation_matrix = np.array([
-            [1, 0, 0, 0],
-            [0, cos_a, -sin_a, 0],
-            [0, sin_a, cos_a, 0],
-            [0, 0, 0, 1]
-        ])
-        self.apply_transformation(rotation_matrix)
+        self.apply_transformation(transform3d.rotation_x(angle))
     
     def rotate_y(self, angle):
-        cos_a, sin_a = math.cos(angle), math.sin(angle)
-        rotation_matrix = np.array([
-            [cos_a, 0, sin_a, 0],
-            [0, 1, 0, 0],
-            [-sin_a, 0, cos_a, 0],
-            [0, 0, 0, 1]
-        ])
-        self.apply_transformation(rotation_matrix)
+        self.apply_transformation(transform3d.rotation_y(angle))
     
     def rotate_z(self, angle):
-        cos_a, sin_a = math.cos(angle), math.sin(angle)
-        rotation_matrix = np.array([
-            [cos_a, -sin_a, 0, 0],
-            [sin_a, cos_a, 0, 0],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ])
-        self.apply_transformation(rotation_matrix)
+        self.apply_transformation(transform3d.rotation_z(angle))
     
     def apply_transformation(self, matrix):
-        homogeneous_vertices = np.column_stack([self.vertices, np.ones(len(self.vertices))])
-        transformed = np.dot(homogeneous_vertices, matrix.T)
-        self.vertices = transformed[:, :3]
-    
-    def project_to_2d(self, width, height, distance=5):
-        projected = []
-        for vertex in self.vertices:
-            x, y, z = vertex
-            if z + distance != 0:
-                screen_x = int((x * distance) / (z + distance) * 200 + width // 2)
-                screen_y = int((y * distance) / (z + distance) * 200 + height // 2)
-            else:
-                screen_x = int(x * 200 + width // 2)
-                screen_y = int(y * 200 + height // 2)
-            projected.append((screen_x, screen_y))
-        return projected
+        self.model = matrix @ self.model
+        self._vertices = None
+
+    @property
+    def vertices(self):
+        if self._vertices is None:
+            self._vertices = self.original_vertices @ self.model[:3, :3].T + self.model[:3, 3]
+        return self._vertices
     
     def reset(self):
-        self.vertices = np.copy(self.original_vertices)
+        self.model = np.eye(4)
+        self._vertices = None
 
 cube_vertices = [
     [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
@@ -98,10 +71,29 @@ pyramid_edges = [
     (1, 2), (2, 3), (3, 4), (4, 1)
 ]
 
+args = demo_options("3D transformations of a wireframe cube and pyramid.")
+
 pygame.init()
 screen = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("3D Transformations")
 clock = pygame.time.Clock()
+camera = Camera(800, 600, focal=1000)
+
+controls = HudPanel([
+    "Controls:",
+    "Arrow Keys - Rotate",
+    "T/G - Translate X",
+    "Y/H - Translate Y", 
+    "U/J - Translate Z",
+    "+/- - Scale",
+    "R - Reset",
+    "SPACE - Auto-rotate",
+    "1 - Cube, 2 - Pyramid",
+    "F3 - Frame timings"
+])
+keyboard = input_source(args)
+timer = FrameTimer()
+show_timings = False
 
 cube = Object3D(cube_vertices, cube_edges)
 pyramid = Object3D(pyramid_vertices, pyramid_edges)
@@ -114,7 +106,8 @@ auto_rotate = False
 
 running = True
 while running:
-    for event in pygame.event.get():
+    timer.start_frame()
+    for event in keyboard.events():
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN:
@@ -145,8 +138,10 @@ while running:
             elif event.key == pygame.K_2:
                 current_object = pyramid
                 object_name = "Pyramid"
+            elif event.key == pygame.K_F3:
+                show_timings = not show_timings
     
-    keys = pygame.key.get_pressed()
+    keys = keyboard.pressed()
     if keys[pygame.K_LEFT]:
         rotation_y -= 0.05
         current_object.rotate_y(-0.05)
@@ -163,43 +158,46 @@ while running:
     if auto_rotate:
         current_object.rotate_y(0.02)
         current_object.rotate_x(0.01)
+    timer.lap('input')
     
-    screen.fill((0, 0, 0))
+    vertices = current_object.vertices
+    timer.lap('transform')
     
-    projected_vertices = current_object.project_to_2d(800, 600)
+    segments, visible = camera.project_edges(vertices, current_object.edges,
+                                             out=current_object.screen_segments)
+    depths = camera.depth(vertices, out=current_object.depths)
+    in_front = np.greater_equal(depths, camera.near, out=current_object.in_front)
+    points = camera.project(vertices, out=current_object.screen_points)
+    timer.lap('projection')
     
-    for edge in current_object.edges:
-        start_pos = projected_vertices[edge[0]]
-        end_pos = projected_vertices[edge[1]]
-        pygame.draw.line(screen, (255, 255, 255), start_pos, end_pos, 2)
-    
-    for i, pos in enumerate(projected_vertices):
-        pygame.draw.circle(screen, (255, 0, 0), pos, 4)
-    
-    font = pygame.font.Font(None, 36)
-    text = font.render(f"Object: {object_name}", True, (255, 255, 255))
-    screen.blit(text, (10, 10))
-    
-    controls = [
-        "Controls:",
-        "Arrow Keys - Rotate",
-        "T/G - Translate X",
-        "Y/H - Translate Y", 
-        "U/J - Translate Z",
-        "+/- - Scale",
-        "R - Reset",
-        "SPACE - Auto-rotate",
-        "1 - Cube, 2 - Pyramid"
-    ]
-    
-    y_offset = 50
-    for control in controls:
-        text = pygame.font.Font(None, 24).render(control, True, (200, 200, 200))
-        screen.blit(text, (10, y_offset))
-        y_offset += 25
+    screen.fill((0, 0, 0))
+    for (x1, y1, x2, y2), shown in zip(segments.tolist(), visible.tolist()):
+        if shown:
+            pygame.draw.line(screen, (255, 255, 255), (x1, y1), (x2, y2), 2)
+    
+    # Vertices behind the near plane are projected too, but not drawn
+    for pos, shown in zip(points.tolist(), in_front.tolist()):
+        if shown:
+            pygame.draw.circle(screen, (255, 0, 0), pos, 4)
+    timer.lap('draw')
+    
+    draw_text(screen, f"Object: {object_name}", (10, 10))
+    controls.draw(screen, (10, 50))
+    if show_timings:
+        for i, line in enumerate(timer.overlay_lines()):
+            draw_text(screen, line, (500, 10 + 20 * i), size=20, color=(255, 255, 0))
+    timer.lap('hud')
     
     pygame.display.flip()
-    clock.tick(60)
+    timer.lap('flip')
+    clock.tick(0 if args.replay else 60)
+    timer.lap('wait')
+    # The frame that saw QUIT is not one of the requested frames
+    if running:
+        timer.end_frame()
 
+keyboard.close()
+if args.timings:
+    timer.save(args.timings)
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# Frames of samples kept per stage for the rolling statistics
+FRAME_WINDOW = 600
+# Frames between refreshes of the on-screen overlay text
+OVERLAY_REFRESH = 30
+
+
+# Per-stage frame timing for the render loops. Each stage is closed with a
+# lap, which charges the time since the previous lap to it:
+#   timer.start_frame()
+#   ...handle input...      timer.lap('input')
+#   ...project...           timer.lap('projection')
+#   pygame.display.flip();  timer.lap('flip')
+#   timer.end_frame()
+# A stage lapped several times in one frame accumulates. The last
+# FRAME_WINDOW frames are kept for percentiles and histograms.
+class FrameTimer:
+    def __init__(self, window=FRAME_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.frames = 0
+        self._current = {}
+        self._last = self._start = time.perf_counter()
+        self._overlay = []
+
+    def start_frame(self):
+        self._current = {}
+        self._last = self._start = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self._current[stage] = self._current.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def end_frame(self):
+        self._current['frame'] = time.perf_counter() - self._start
+        for stage, seconds in self._current.items():
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.window)
+            self.samples[stage].append(seconds)
+        self.frames += 1
+        if self.frames % OVERLAY_REFRESH == 1:
+            self._overlay = None
+
+    # Percentiles in milliseconds of one stage's recent frames
+    def percentiles(self, stage, q=(50, 95, 99)):
+        return np.percentile(np.array(self.samples[stage]) * 1000, q)
+
+    # Counts and bin edges in milliseconds of one stage's recent frames
+    def histogram(self, stage, bins=20):
+        return np.histogram(np.array(self.samples[stage]) * 1000, bins)
+
+    def summary(self):
+        stages = {}
+        for stage, samples in self.samples.items():
+            ms = np.array(samples) * 1000
+            p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+            counts, edges = np.histogram(ms, 20)
+            stages[stage] = {'samples': len(ms), 'mean_ms': ms.mean(), 'p50_ms': p50,
+                             'p95_ms': p95, 'p99_ms': p99, 'max_ms': ms.max(),
+                             'histogram': {'counts': counts.tolist(), 'edges_ms': edges.tolist()}}
+        return {'frames': self.frames, 'window': self.window, 'stages': stages}
+
+    def save(self, path):
+        with open(path, 'w') as stream:
+            json.dump(self.summary(), stream, indent=2, default=float)
+
+    # One line per stage for the on-screen overlay. The text only changes
+    # every OVERLAY_REFRESH frames so the HUD cache is not flooded.
+    def overlay_lines(self):
+        if self._overlay is None:
+            self._overlay = []
+            for stage, samples in self.samples.items():
+                ms = np.array(samples) * 1000
+                self._overlay.append(f"{stage:<11s}{ms.mean():6.2f} ms  p95 {np.percentile(ms, 95):6.2f}")
+        return self._overlay
@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+import pygame
+
+# Text for the pygame HUDs. Loading a font reads it from disk and rendering
+# rasterizes every glyph, so both are cached: fonts are loaded once per size
+# and rendered surfaces are kept for the most recent (text, size, colour)
+# triples. A label whose text did not change costs a dictionary lookup.
+# Colours must be tuples. pygame.init() must run before the first call.
+
+MAX_TEXT_SURFACES = 256
+
+
+@lru_cache(maxsize=None)
+def font(size):
+    return pygame.font.Font(None, size)
+
+
+@lru_cache(maxsize=MAX_TEXT_SURFACES)
+def text_surface(text, size, color, antialias=True):
+    return font(size).render(text, antialias, color)
+
+
+def draw_text(screen, text, pos, size=36, color=(255, 255, 255)):
+    screen.blit(text_surface(text, size, color), pos)
+
+
+# Lines of static text composited once into one transparent surface, so
+# redrawing the whole panel is a single blit
+class HudPanel:
+    def __init__(self, lines, size=24, color=(200, 200, 200), line_height=25):
+        self.lines = list(lines)
+        self.size = size
+        self.color = color
+        self.line_height = line_height
+        self._surface = None
+
+    @property
+    def surface(self):
+        if self._surface is None:
+            rendered = [text_surface(line, self.size, self.color) for line in self.lines]
+            width = max((line.get_width() for line in rendered), default=0)
+            height = self.line_height * len(rendered)
+            self._surface = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+            for i, line in enumerate(rendered):
+                self._surface.blit(line, (0, i * self.line_height))
+        return self._surface
+
+    def draw(self, screen, pos):
+        screen.blit(self.surface, pos)
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    lines = ["Controls:", "Arrow Keys - Rotate", "T/G - Translate X", "Y/H - Translate Y",
+             "U/J - Translate Z", "+/- - Scale", "R - Reset", "SPACE - Auto-rotate"]
+
+    start = time.perf_counter()
+    for _ in range(100):
+        for i, line in enumerate(lines):
+            screen.blit(pygame.font.Font(None, 24).render(line, True, (200, 200, 200)),
+                        (10, 50 + 25 * i))
+    print(f"uncached: {(time.perf_counter() - start) * 10:.3f} ms per frame")
+
+    panel = HudPanel(lines)
+    start = time.perf_counter()
+    for _ in range(100):
+        draw_text(screen, "Object: Cube", (10, 10))
+        panel.draw(screen, (10, 50))
+    print(f"cached: {(time.perf_counter() - start) * 10:.3f} ms per frame")
+    pygame.quit()
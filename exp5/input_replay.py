@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+
+import pygame
+
+# Keyboard input for the pygame demos that can be recorded and replayed.
+#
+# An input script is a JSON list of steps. Each step is one frame with the
+# keys pressed on that frame and the keys held down, repeated "frames" times:
+#   [{"held": ["left"], "frames": 120},
+#    {"keydown": ["t"]},
+#    {"keydown": ["space"], "frames": 300}]
+# Keys use pygame.key.name() names. Replaying needs no display: the demos
+# switch to SDL's dummy video driver, so stage timings can be measured
+# reproducibly on a headless machine.
+
+
+def load_script(path):
+    with open(path) as stream:
+        return json.load(stream)
+
+
+def save_script(path, steps):
+    with open(path, 'w') as stream:
+        json.dump(steps, stream, indent=1)
+
+
+# The demos' command line: --record, --replay, --frames and --timings.
+# Must run before pygame.init() so that replays get the dummy drivers.
+def demo_options(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--record', help="save the keyboard input to this JSON script")
+    parser.add_argument('--replay', help="drive the demo from a JSON input script, headless")
+    parser.add_argument('--frames', type=int,
+                        help="with --replay, run exactly this many frames, looping the script")
+    parser.add_argument('--timings', help="write per-stage frame timings to this JSON file on exit")
+    args = parser.parse_args()
+    if args.replay:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    return args
+
+
+def input_source(args):
+    if args.replay:
+        return ReplayInput(args.replay, args.frames)
+    return LiveInput(args.record)
+
+
+# The real keyboard, optionally recorded into an input script
+class LiveInput:
+    def __init__(self, record=None):
+        self.record = record
+        self.steps = []
+        self._held = set()
+
+    def events(self):
+        events = pygame.event.get()
+        if self.record is not None:
+            keydown = []
+            for event in events:
+                if event.type == pygame.KEYDOWN:
+                    keydown.append(pygame.key.name(event.key))
+                    self._held.add(pygame.key.name(event.key))
+                elif event.type == pygame.KEYUP:
+                    self._held.discard(pygame.key.name(event.key))
+            self._append({'keydown': keydown, 'held': sorted(self._held)})
+        return events
+
+    # A frame with no key pressed and the same keys held as the step before
+    # extends that step
+    def _append(self, step):
+        step = {key: value for key, value in step.items() if value}
+        last = self.steps[-1] if self.steps else None
+        if last is not None and 'keydown' not in step and last.get('held') == step.get('held'):
+            last['frames'] = last.get('frames', 1) + 1
+        else:
+            self.steps.append(step)
+
+    def pressed(self):
+        return pygame.key.get_pressed()
+
+    def close(self):
+        if self.record is not None:
+            save_script(self.record, self.steps)
+
+
+# Held keys of a replayed frame, indexed like pygame.key.get_pressed()
+class _Pressed:
+    def __init__(self, keys):
+        self.keys = keys
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+# Input from a script. Once the script (or the requested number of frames)
+# runs out, a QUIT event ends the demo.
+class ReplayInput:
+    def __init__(self, path, frames=None):
+        self.steps = load_script(path)
+        self.frames = frames
+        self.frame = 0
+        self._frames = self._expand()
+        self._held = _Pressed(set())
+
+    def _expand(self):
+        while True:
+            for step in self.steps:
+                keydown = [pygame.key.key_code(name) for name in step.get('keydown', [])]
+                held = {pygame.key.key_code(name) for name in step.get('held', [])}
+                yield keydown, held
+                for _ in range(step.get('frames', 1) - 1):
+                    yield [], held
+            if self.frames is None or not self.steps:
+                return
+
+    def events(self):
+        pygame.event.pump()
+        frame = next(self._frames, None) if self.frames is None or self.frame < self.frames else None
+        if frame is None:
+            return [pygame.event.Event(pygame.QUIT)]
+        self.frame += 1
+        keydown, held = frame
+        self._held = _Pressed(held)
+        return [pygame.event.Event(pygame.KEYDOWN, key=key) for key in keydown]
+
+    def pressed(self):
+        return self._held
+
+    def close(self):
+        pass
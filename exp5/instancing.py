@@ -0,0 +1,58 @@
+import numpy as np
+
+# Instanced geometry: one mesh drawn under a stack of (N, 4, 4) instance
+# matrices, such as the draw lists of scene_graph.Scene. Every instance is
+# evaluated in one batched matmul, and the results are laid out so that the
+# whole set goes to a single Line3DCollection, Poly3DCollection or
+# Camera.project() call.
+
+
+# Mesh vertices (V, 3) under every instance matrix, as an (N, V, 3) array.
+# np.matmul broadcasts the (V, 3) mesh over the (N, 3, 3) linear parts,
+# which is the contraction einsum('vj,nij->nvi') without einsum's overhead.
+def instance_vertices(vertices, matrices, out=None):
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    out = np.matmul(vertices, matrices[:, :3, :3].transpose(0, 2, 1), out=out)
+    out += matrices[:, None, :3, 3]
+    return out
+
+
+# Edge endpoints of every instance as (N * E, 2, 3) segments, in instance
+# order
+def instance_edges(vertices, edges, matrices):
+    edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+    return instance_vertices(vertices, matrices)[:, edges].reshape(-1, 2, 3)
+
+
+# Corners of every face of every instance as (N * F, K, 3) polygons. faces
+# is an (F, K) array of vertex indices, all faces having K corners.
+def instance_faces(vertices, faces, matrices):
+    faces = np.asarray(faces, dtype=np.intp)
+    return instance_vertices(vertices, matrices)[:, faces].reshape(-1, faces.shape[1], 3)
+
+
+# A per-instance attribute (colours, ...) repeated for every edge or face of
+# its instance, matching the order of instance_edges() and instance_faces()
+def per_instance(values, count):
+    return np.repeat(np.asarray(values), count, axis=0)
+
+
+if __name__ == "__main__":
+    import time
+
+    cube = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float)
+    edges = [(0, 1), (1, 3), (3, 2), (2, 0), (4, 5), (5, 7), (7, 6), (6, 4),
+             (0, 4), (1, 5), (2, 6), (3, 7)]
+    rng = np.random.default_rng(0)
+    matrices = np.tile(np.eye(4), (10_000, 1, 1))
+    matrices[:, :3, 3] = rng.random((10_000, 3)) * 100
+
+    out = np.empty((len(matrices), len(cube), 3))
+    start = time.perf_counter()
+    instance_vertices(cube, matrices, out=out)
+    print(f"{len(matrices)} instances in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    segments = instance_edges(cube, edges, matrices)
+    print(f"{len(segments)} segments in {(time.perf_counter() - start) * 1000:.2f} ms")
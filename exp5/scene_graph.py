@@ -0,0 +1,214 @@
+import numpy as np
+
+from transform3d import rotation_x, rotation_y, rotation_z, scaling, translation
+
+# Hierarchical scenes of meshes, e.g. a building made of floors made of rooms.
+#
+# Every node has a local 4x4 transform relative to its parent. World matrices
+# are cached; changing a local transform only marks the node, and the next
+# update() recomputes the world matrices of the marked subtrees and nothing
+# else. The world matrices of all nodes drawing the same mesh live in one
+# (K, 4, 4) array, so a frame's draw lists are ready without a traversal.
+
+
+# World matrices of every node that draws one mesh. Rows are kept packed:
+# a removed node's row is filled with the last one.
+class _Batch:
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.matrices = np.empty((16, 4, 4))
+        self.nodes = []
+
+    def add(self, node):
+        if len(self.nodes) == len(self.matrices):
+            grown = np.empty((2 * len(self.matrices), 4, 4))
+            grown[:len(self.nodes)] = self.matrices
+            self.matrices = grown
+        node._batch, node._slot = self, len(self.nodes)
+        self.nodes.append(node)
+
+    def remove(self, node):
+        last = self.nodes.pop()
+        if last is not node:
+            self.nodes[node._slot] = last
+            self.matrices[node._slot] = self.matrices[len(self.nodes)]
+            last._slot = node._slot
+        node._batch = node._slot = None
+
+
+# One node of a scene. mesh is whatever the renderer draws (an Object3D, a
+# vertex array, ...) or None for a pure grouping node. Transforms pre-multiply
+# the local matrix like Object3D does, so they apply in the order called.
+class SceneNode:
+    def __init__(self, mesh=None, local=None, name=None):
+        self.mesh = mesh
+        self.name = name
+        self.local = np.eye(4) if local is None else np.array(local, dtype=np.float64)
+        self.parent = None
+        self.children = []
+        self.scene = None
+        self._world = np.eye(4)
+        self._batch = self._slot = None
+
+    def add(self, child):
+        if child.parent is not None:
+            child.parent.remove(child)
+        child.parent = self
+        self.children.append(child)
+        if self.scene is not None:
+            self.scene._attach(child)
+        return child
+
+    def remove(self, child):
+        self.children.remove(child)
+        child.parent = None
+        if self.scene is not None:
+            self.scene._detach(child)
+
+    def set_local(self, matrix):
+        self.local = np.array(matrix, dtype=np.float64)
+        self.invalidate()
+
+    def transform(self, matrix):
+        self.local = matrix @ self.local
+        self.invalidate()
+        return self
+
+    def translate(self, dx, dy, dz):
+        return self.transform(translation(dx, dy, dz))
+
+    def scale(self, sx, sy, sz):
+        return self.transform(scaling(sx, sy, sz))
+
+    def rotate_x(self, angle):
+        return self.transform(rotation_x(angle))
+
+    def rotate_y(self, angle):
+        return self.transform(rotation_y(angle))
+
+    def rotate_z(self, angle):
+        return self.transform(rotation_z(angle))
+
+    def invalidate(self):
+        if self.scene is not None:
+            self.scene._dirty.add(self)
+
+    # Where the cached world matrix is stored
+    def _storage(self):
+        return self._world if self._batch is None else self._batch.matrices[self._slot]
+
+    @property
+    def world(self):
+        if self.scene is None:
+            return self.local if self.parent is None else self.parent.world @ self.local
+        self.scene.update()
+        return self._storage()
+
+    def walk(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+
+# A scene and its root node:
+#   scene = Scene()
+#   floor = scene.add(SceneNode(name='floor 1'))
+#   floor.add(SceneNode(room_mesh, translation(4, 0, 0)))
+#   floor.translate(0, 3, 0)                    # only this floor is re-evaluated
+#   for mesh, matrices in scene.draw_lists():   # (K, 4, 4) world matrices
+#       ...
+class Scene:
+    def __init__(self):
+        self._batches = {}
+        self._dirty = set()
+        self.nodes_updated = 0
+        self.root = SceneNode(name='root')
+        self._attach(self.root)
+
+    def add(self, node, parent=None):
+        return (self.root if parent is None else parent).add(node)
+
+    def _attach(self, node):
+        for member in node.walk():
+            member.scene = self
+            if member.mesh is not None:
+                key = id(member.mesh)
+                if key not in self._batches:
+                    self._batches[key] = _Batch(member.mesh)
+                self._batches[key].add(member)
+        self._dirty.add(node)
+
+    def _detach(self, node):
+        for member in node.walk():
+            if member._batch is not None:
+                batch = member._batch
+                member._world = batch.matrices[member._slot].copy()
+                batch.remove(member)
+                if not batch.nodes:
+                    del self._batches[id(batch.mesh)]
+            member.scene = None
+            self._dirty.discard(member)
+
+    def _under_dirty(self, node):
+        parent = node.parent
+        while parent is not None:
+            if parent in self._dirty:
+                return True
+            parent = parent.parent
+        return False
+
+    # Recompute the world matrices of every dirty subtree
+    def update(self):
+        if not self._dirty:
+            return
+        roots = [node for node in self._dirty if not self._under_dirty(node)]
+        self._dirty.clear()
+        for root in roots:
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                if node.parent is None:
+                    node._storage()[...] = node.local
+                else:
+                    np.matmul(node.parent._storage(), node.local, out=node._storage())
+                stack.extend(node.children)
+                self.nodes_updated += 1
+
+    # (mesh, (K, 4, 4) world matrices) for every mesh in the scene. The
+    # matrices are views into the scene's cache, valid until the next change.
+    def draw_lists(self):
+        self.update()
+        return [(batch.mesh, batch.matrices[:len(batch.nodes)])
+                for batch in self._batches.values()]
+
+    def __len__(self):
+        return sum(1 for _ in self.root.walk())
+
+
+if __name__ == "__main__":
+    import time
+
+    room = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float)
+    scene = Scene()
+    building = scene.add(SceneNode(name='building'))
+    floors = []
+    for level in range(20):
+        floor = building.add(SceneNode(local=translation(0, 3 * level, 0), name=f'floor {level}'))
+        for i in range(500):
+            floor.add(SceneNode(room, translation(i % 25 * 4, 0, i // 25 * 4)))
+        floors.append(floor)
+
+    start = time.perf_counter()
+    scene.update()
+    print(f"{len(scene)} nodes, first update of {scene.nodes_updated} "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    scene.nodes_updated = 0
+    start = time.perf_counter()
+    floors[7].translate(0.5, 0, 0)
+    draw_lists = scene.draw_lists()
+    print(f"moved one floor: {scene.nodes_updated} nodes updated "
+          f"in {(time.perf_counter() - start) * 1000:.2f} ms, "
+          f"{sum(len(matrices) for _, matrices in draw_lists)} instances to draw")
@@ -0,0 +1,53 @@
+import numpy as np
+
+# 4x4 homogeneous transforms, the matrices Object3D in
+# exp5_3d_transformations.py builds. Angles are in radians.
+
+
+# Translation matrix
+def translation(dx, dy, dz):
+    return np.array([[1, 0, 0, dx],
+                     [0, 1, 0, dy],
+                     [0, 0, 1, dz],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+# Scaling matrix
+def scaling(sx, sy, sz):
+    return np.array([[sx, 0, 0, 0],
+                     [0, sy, 0, 0],
+                     [0, 0, sz, 0],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+# Rotation about the x axis
+def rotation_x(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[1, 0, 0, 0],
+                     [0, c, -s, 0],
+                     [0, s, c, 0],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+# Rotation about the y axis
+def rotation_y(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, 0, s, 0],
+                     [0, 1, 0, 0],
+                     [-s, 0, c, 0],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+# Rotation about the z axis
+def rotation_z(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0, 0],
+                     [s, c, 0, 0],
+                     [0, 0, 1, 0],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+# (N, 3) points transformed by one 4x4 matrix
+def transform_points(points, matrix):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
@@ -1,28 +1,32 @@
 import pygame
 import numpy as np
 import math
+import os
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'exp5'))
+from camera import Camera
+from face_pipeline import depth_order, intensity, shade_faces
+from lod import cached_mesh
+from zbuffer import ZBuffer, triangulate
+from frame_timing import FrameTimer
+from hud import HudPanel, draw_text
+from input_replay import demo_options, input_source
+
 def normalize_vector(v):
     norm = np.linalg.norm(v)
     if norm == 0:
         return v
     return v / norm
 
-def calculate_normal(v1, v2, v3):
-    edge1 = np.array(v2) - np.array(v1)
-    edge2 = np.array(v3) - np.array(v1)
-    normal = np.cross(edge1, edge2)
-    return normalize_vector(normal)
-
-def calculate_lighting(normal, light_direction, light_intensity=1.0):
-    dot_product = np.dot(normal, light_direction)
-    return max(0, dot_product) * light_intensity
-
 class Object3D:
-    def __init__(self, vertices, faces):
-        self.vertices = np.array(vertices, dtype=float)
-        self.faces = faces
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.vertices = mesh.vertices
+        self.faces = mesh.triangles
+        self.screen = np.empty((len(self.vertices), 2), dtype=np.int32)
+        self.screen_xy = np.empty((len(self.vertices), 2), dtype=np.float32)
+        self.rotation_matrix = np.eye(3)
         self.angle_x = 0
         self.angle_y = 0
     
@@ -46,68 +50,46 @@ class Object3D:
         ])
         
         rotation_matrix = np.dot(rotation_y, rotation_x)
+        self.rotation_matrix = rotation_matrix
         return np.dot(self.vertices, rotation_matrix.T)
     
-    def project_to_2d(self, vertices_3d, width, height, distance=5):
-        projected = []
-        for vertex in vertices_3d:
-            x, y, z = vertex
-            z_offset = z + distance
-            if z_offset != 0:
-                screen_x = int((x * 300) / z_offset + width // 2)
-                screen_y = int((-y * 300) / z_offset + height // 2)
-            else:
-                screen_x = int(x * 300 + width // 2)
-                screen_y = int(-y * 300 + height // 2)
-            projected.append((screen_x, screen_y))
-        return projected
+    # Smooth shading normals, cached by the mesh and rotated with the vertices
+    def rotated_normals(self):
+        return np.dot(self.mesh.normals, self.rotation_matrix.T)
 
 def create_cube():
-    vertices = [
-        [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
-        [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]
-    ]
-    
-    faces = [
-        [0, 1, 2, 3], [4, 7, 6, 5], [0, 4, 5, 1],
-        [2, 6, 7, 3], [0, 3, 7, 4], [1, 5, 6, 2]
-    ]
-    
-    return Object3D(vertices, faces)
+    return Object3D(cached_mesh('cube', 1.0))
 
 def create_sphere(radius=1, segments=16):
-    vertices = []
-    faces = []
-    
-    for i in range(segments + 1):
-        lat = math.pi * i / segments - math.pi / 2
-        for j in range(segments):
-            lon = 2 * math.pi * j / segments
-            x = radius * math.cos(lat) * math.cos(lon)
-            y = radius * math.sin(lat)
-            z = radius * math.cos(lat) * math.sin(lon)
-            vertices.append([x, y, z])
-    
-    for i in range(segments):
-        for j in range(segments):
-            current = i * segments + j
-            next_row = (i + 1) * segments + j
-            next_col = i * segments + (j + 1) % segments
-            next_both = (i + 1) * segments + (j + 1) % segments
-            
-            if i < segments:
-                faces.append([current, next_row, next_both, next_col])
-    
-    return Object3D(vertices, faces)
+    return Object3D(cached_mesh('sphere', radius, segments))
 
 def draw_filled_polygon(screen, points, color):
     if len(points) >= 3:
         pygame.draw.polygon(screen, color, points)
 
+args = demo_options("3D rendering of a cube and a sphere with flat shading.")
+
 pygame.init()
 screen = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("3D Rendering with Shading")
 clock = pygame.time.Clock()
+camera = Camera(800, 600, focal=300)
+zbuffer = ZBuffer(800, 600, background=(20, 20, 30))
+
+controls = HudPanel([
+    "Controls:",
+    "1 - Cube",
+    "2 - Sphere", 
+    "Arrow Keys - Rotate",
+    "W - Toggle Wireframe",
+    "Z - Toggle Z-buffer",
+    "S - Flat/Gouraud/Phong",
+    "SPACE - Auto-rotate",
+    "F3 - Frame timings"
+])
+keyboard = input_source(args)
+timer = FrameTimer()
+show_timings = False
 
 cube = create_cube()
 sphere = create_sphere()
@@ -116,6 +98,9 @@ object_name = "Cube"
 
 light_direction = normalize_vector(np.array([1, 1, 1]))
 wireframe_mode = False
+zbuffer_mode = False
+shading_modes = ["Flat", "Gouraud", "Phong"]
+shading_mode = "Flat"
 auto_rotate = True
 
 base_colors = {
@@ -123,10 +108,17 @@ base_colors = {
              (255, 255, 100), (255, 100, 255), (100, 255, 255)],
     "Sphere": [(200, 100, 50)] * 100
 }
+# Base colour of every triangle: the cube's own colours, two triangles per
+# side, and the sphere's first one
+face_colors = {
+    "Cube": np.repeat(base_colors["Cube"], 2, axis=0),
+    "Sphere": np.broadcast_to(base_colors["Sphere"][0], (len(sphere.faces), 3))
+}
 
 running = True
 while running:
-    for event in pygame.event.get():
+    timer.start_frame()
+    for event in keyboard.events():
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN:
@@ -138,10 +130,16 @@ while running:
                 object_name = "Sphere"
             elif event.key == pygame.K_w:
                 wireframe_mode = not wireframe_mode
+            elif event.key == pygame.K_z:
+                zbuffer_mode = not zbuffer_mode
+            elif event.key == pygame.K_s:
+                shading_mode = shading_modes[(shading_modes.index(shading_mode) + 1) % len(shading_modes)]
             elif event.key == pygame.K_SPACE:
                 auto_rotate = not auto_rotate
+            elif event.key == pygame.K_F3:
+                show_timings = not show_timings
     
-    keys = pygame.key.get_pressed()
+    keys = keyboard.pressed()
     rotation_speed = 0.02
     
     if keys[pygame.K_LEFT] or auto_rotate:
@@ -152,75 +150,79 @@ while running:
         current_object.rotate(-rotation_speed, 0)
     if keys[pygame.K_DOWN]:
         current_object.rotate(rotation_speed, 0)
-    
-    screen.fill((20, 20, 30))
+    timer.lap('input')
     
     rotated_vertices = current_object.rotate(0, 0)
-    projected_vertices = current_object.project_to_2d(rotated_vertices, 800, 600)
-    
-    face_data = []
-    for i, face in enumerate(current_object.faces):
-        if len(face) >= 3:
-            v1 = rotated_vertices[face[0]]
-            v2 = rotated_vertices[face[1]]
-            v3 = rotated_vertices[face[2]]
-            
-            normal = calculate_normal(v1, v2, v3)
-            
-            if normal[2] > 0:
-                continue
-            
-            center_z = sum(rotated_vertices[vertex_idx][2] for vertex_idx in face) / len(face)
-            
-            lighting = calculate_lighting(normal, light_direction)
-            
-            if object_name == "Cube" and i < len(base_colors[object_name]):
-                base_color = base_colors[object_name][i]
+    timer.lap('transform')
+    projected_vertices = camera.project(rotated_vertices, out=current_object.screen)
+    timer.lap('projection')
+    
+    visible, shaded_colors = shade_faces(rotated_vertices, current_object.faces,
+                                         face_colors[object_name], light_direction)
+    timer.lap('shading')
+    
+    if (zbuffer_mode or shading_mode != "Flat") and not wireframe_mode:
+        # Per-pixel occlusion: no depth sort, one blit of the colour buffer.
+        # Smooth shading always goes through the z-buffer.
+        screen_xy = camera.project(rotated_vertices, out=current_object.screen_xy)
+        depth = camera.depth(rotated_vertices)
+        triangles = triangulate(current_object.faces[visible])
+        fan = current_object.faces.shape[1] - 2
+        zbuffer.clear()
+        if shading_mode == "Flat":
+            triangle_colors = np.repeat(shaded_colors, fan, axis=0)
+            zbuffer.draw_triangles(screen_xy, depth, triangles, triangle_colors)
+        else:
+            normals = current_object.rotated_normals()
+            triangle_colors = np.repeat(face_colors[object_name][visible], fan, axis=0)
+            if shading_mode == "Gouraud":
+                vertex_light = intensity(normals, light_direction)[:, None]
+                zbuffer.draw_interpolated(screen_xy, depth, triangles, triangle_colors,
+                                          vertex_light, lambda values: values[:, 0])
             else:
-                base_color = base_colors[object_name][0]
-            
-            shaded_color = tuple(int(c * (0.3 + 0.7 * lighting)) for c in base_color)
-            
-            face_points = [projected_vertices[vertex_idx] for vertex_idx in face]
-            
-            face_data.append((center_z, face_points, shaded_color))
-    
-    face_data.sort(key=lambda x: x[0], reverse=True)
-    
-    for center_z, face_points, color in face_data:
-        if wireframe_mode:
-            if len(face_points) >= 3:
+                def phong(values):
+                    length = np.linalg.norm(values, axis=1, keepdims=True)
+                    return intensity(values / np.maximum(length, 1e-12), light_direction)
+                zbuffer.draw_interpolated(screen_xy, depth, triangles, triangle_colors,
+                                          normals, phong)
+        zbuffer.present(screen)
+        timer.lap('draw')
+    else:
+        order = depth_order(rotated_vertices, current_object.faces, visible)
+        face_points_list = projected_vertices[current_object.faces[visible[order]]].tolist()
+        face_color_list = shaded_colors[order].tolist()
+        timer.lap('sort')
+        
+        screen.fill((20, 20, 30))
+        for face_points, color in zip(face_points_list, face_color_list):
+            if wireframe_mode:
                 pygame.draw.polygon(screen, (255, 255, 255), face_points, 2)
-        else:
-            draw_filled_polygon(screen, face_points, color)
-            if len(face_points) >= 3:
+            else:
+                draw_filled_polygon(screen, face_points, color)
                 pygame.draw.polygon(screen, (50, 50, 50), face_points, 1)
-    
-    font = pygame.font.Font(None, 36)
-    text = font.render(f"Object: {object_name}", True, (255, 255, 255))
-    screen.blit(text, (10, 10))
-    
-    mode_text = "Wireframe" if wireframe_mode else "Solid"
-    mode_surface = font.render(f"Mode: {mode_text}", True, (255, 255, 255))
-    screen.blit(mode_surface, (10, 50))
-    
-    controls = [
-        "Controls:",
-        "1 - Cube",
-        "2 - Sphere", 
-        "Arrow Keys - Rotate",
-        "W - Toggle Wireframe",
-        "SPACE - Auto-rotate"
-    ]
-    
-    y_offset = 100
-    for control in controls:
-        text = pygame.font.Font(None, 24).render(control, True, (200, 200, 200))
-        screen.blit(text, (10, y_offset))
-        y_offset += 25
+        timer.lap('draw')
+    
+    draw_text(screen, f"Object: {object_name}", (10, 10))
+    mode_text = "Wireframe" if wireframe_mode else "Z-buffer" if zbuffer_mode else "Solid"
+    if not wireframe_mode:
+        mode_text += f", {shading_mode}"
+    draw_text(screen, f"Mode: {mode_text}", (10, 50))
+    controls.draw(screen, (10, 100))
+    if show_timings:
+        for i, line in enumerate(timer.overlay_lines()):
+            draw_text(screen, line, (500, 10 + 20 * i), size=20, color=(255, 255, 0))
+    timer.lap('hud')
     
     pygame.display.flip()
-    clock.tick(60)
+    timer.lap('flip')
+    clock.tick(0 if args.replay else 60)
+    timer.lap('wait')
+    # The frame that saw QUIT is not one of the requested frames
+    if running:
+        timer.end_frame()
 
+keyboard.close()
+if args.timings:
+    timer.save(args.timings)
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import numpy as np
+
+# The per-face stage of the exp6 renderer over whole meshes at once.
+#
+# faces is an (F, K) int array of vertex indices, every face having K >= 3
+# corners, and vertices the rotated (V, 3) vertices in the renderer's space,
+# where the camera looks along +z. The normal of a face is taken from its
+# first three corners like calculate_normal() did.
+
+
+# Unit normals of every face; degenerate faces get a zero normal
+def face_normals(vertices, faces):
+    v0, v1, v2 = (vertices[faces[:, k]] for k in range(3))
+    normals = np.cross(v1 - v0, v2 - v0)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, length, out=normals, where=length > 0)
+    return normals
+
+
+# Lambert intensity of unit normals under one unit light direction
+def lambert(normals, light_direction, light_intensity=1.0):
+    return np.maximum(normals @ light_direction, 0) * light_intensity
+
+
+# Brightness factor ambient + (1 - ambient) * Lambert applied to base colours
+def intensity(normals, light_direction, ambient=0.3):
+    return ambient + (1 - ambient) * lambert(normals, light_direction)
+
+
+# Area-weighted unit normals of every vertex, for smooth shading. Each face
+# adds the cross products of its fan triangles, whose length is twice their
+# area, to its corners. Depends only on the mesh, so compute it once.
+# Works on one contiguous array per coordinate and per corner column: the
+# gathers and the per-corner bincounts then run over plain 1-D data.
+def vertex_normals(vertices, faces):
+    x, y, z = np.asarray(vertices, dtype=np.float64).T.copy()
+    faces = np.asarray(faces, dtype=np.intp)
+    normals = np.zeros((3, len(x)))
+    first = np.ascontiguousarray(faces[:, 0])
+    x0, y0, z0 = x.take(first), y.take(first), z.take(first)
+    for k in range(1, faces.shape[1] - 1):
+        b, c = np.ascontiguousarray(faces[:, k]), np.ascontiguousarray(faces[:, k + 1])
+        ux, uy, uz = x.take(b) - x0, y.take(b) - y0, z.take(b) - z0
+        vx, vy, vz = x.take(c) - x0, y.take(c) - y0, z.take(c) - z0
+        weighted = (uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx)
+        for axis, weight in enumerate(weighted):
+            for corner in (first, b, c):
+                normals[axis] += np.bincount(corner, weight, len(x))
+    length = np.sqrt((normals ** 2).sum(axis=0))
+    np.divide(normals, length, out=normals, where=length > 0)
+    return np.ascontiguousarray(normals.T)
+
+
+# Back-face culling and flat shading. Faces whose normal points away from
+# the camera are dropped; the others get their base colour scaled by
+# ambient + (1 - ambient) * Lambert. base_colors is (F, 3).
+# Without eye the camera is taken to be far away along -z; with an eye
+# position a face is dropped when dot(normal, centroid - eye) >= 0, which
+# is right for a perspective camera close to the mesh.
+# Returns the indices of the front faces and their integer colours.
+def shade_faces(vertices, faces, base_colors, light_direction, ambient=0.3, eye=None):
+    normals = face_normals(vertices, faces)
+    if eye is None:
+        visible = np.flatnonzero(normals[:, 2] <= 0)
+    else:
+        view = vertices[faces].mean(axis=1) - eye
+        visible = np.flatnonzero(np.einsum('ij,ij->i', normals, view) < 0)
+    lighting = intensity(normals[visible], light_direction, ambient)
+    colors = (np.asarray(base_colors)[visible] * lighting[:, None]).astype(np.int64)
+    return visible, colors
+
+
+# Painter's order of the given faces: a permutation of them, farthest
+# average depth first. Ties keep face order.
+def depth_order(vertices, faces, visible):
+    depth = vertices[faces[visible], 2].mean(axis=1)
+    return np.argsort(-depth, kind='stable')
+
+
+if __name__ == "__main__":
+    import time
+
+    segments = 64
+    lat = np.pi * np.arange(segments + 1) / segments - np.pi / 2
+    lon = 2 * np.pi * np.arange(segments) / segments
+    vertices = np.stack(np.broadcast_arrays(np.cos(lat)[:, None] * np.cos(lon),
+                                            np.sin(lat)[:, None] + 0 * lon,
+                                            np.cos(lat)[:, None] * np.sin(lon)), axis=-1).reshape(-1, 3)
+    i, j = np.meshgrid(np.arange(segments), np.arange(segments), indexing='ij')
+    faces = np.stack([i * segments + j, (i + 1) * segments + j,
+                      (i + 1) * segments + (j + 1) % segments,
+                      i * segments + (j + 1) % segments], axis=-1).reshape(-1, 4)
+    colors = np.broadcast_to((200, 100, 50), (len(faces), 3))
+    light = np.ones(3) / np.sqrt(3)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        visible, shaded = shade_faces(vertices, faces, colors, light)
+        order = depth_order(vertices, faces, visible)
+    print(f"{len(faces)} faces, {len(visible)} visible in "
+          f"{(time.perf_counter() - start) * 10:.2f} ms per frame")
@@ -0,0 +1,106 @@
+from functools import lru_cache
+
+import numpy as np
+
+from mesh import cube_mesh, sphere_mesh
+
+# Sphere tessellations, coarsest first
+SPHERE_SEGMENTS = (6, 12, 24, 48)
+# Projected radius in pixels from which the next finer level is used
+SPHERE_THRESHOLDS = (8, 24, 72)
+# Fraction a threshold must be passed by before an object changes level
+HYSTERESIS = 0.15
+MESH_CACHE_SIZE = 64
+
+_PRIMITIVES = {'sphere': sphere_mesh, 'cube': cube_mesh}
+
+
+# Procedural meshes by (shape, parameters), built once and shared, e.g.
+# cached_mesh('sphere', 1.0, 32). Keep the arrays read-only.
+@lru_cache(maxsize=MESH_CACHE_SIZE)
+def cached_mesh(shape, *params):
+    return _PRIMITIVES[shape](*params)
+
+
+def sphere_levels(radius=1.0, segments=SPHERE_SEGMENTS):
+    return [cached_mesh('sphere', radius, n) for n in segments]
+
+
+# Projected radius in pixels of bounding spheres (centres (N, 3), radii
+# (N,)) and which of them overlap the screen at all
+def screen_radius(camera, centers, radii):
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), len(centers))
+    depth = camera.depth(centers)
+    projected = camera.projection[0, 0] * radii / np.maximum(depth, camera.near)
+    xy = camera.project(centers, dtype=np.float64)
+    visible = ((depth + radii > camera.near)
+               & (xy[:, 0] + projected >= 0) & (xy[:, 0] - projected < camera.width)
+               & (xy[:, 1] + projected >= 0) & (xy[:, 1] - projected < camera.height))
+    return projected, visible
+
+
+# Level of detail per object from its projected size. A level k is used
+# from thresholds[k - 1] pixels on; an object only moves to another level
+# once its size is past the threshold by the hysteresis fraction, so
+# objects hovering at a threshold do not pop back and forth every frame.
+class LodSelector:
+    def __init__(self, thresholds=SPHERE_THRESHOLDS, hysteresis=HYSTERESIS):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.hysteresis = hysteresis
+        self.levels = None
+
+    # Levels (N,) for projected radii (N,); the objects must keep their
+    # order between frames. A change in count starts over.
+    def select(self, radii):
+        radii = np.asarray(radii, dtype=np.float64)
+        if self.levels is None or len(self.levels) != len(radii):
+            self.levels = np.searchsorted(self.thresholds, radii, 'right')
+        else:
+            up = np.searchsorted(self.thresholds * (1 + self.hysteresis), radii, 'right')
+            down = np.searchsorted(self.thresholds * (1 - self.hysteresis), radii, 'right')
+            self.levels = np.clip(self.levels, up, down)
+        return self.levels
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'exp5'))
+    from camera import Camera
+    from face_pipeline import shade_faces
+    from zbuffer import ZBuffer
+
+    rng = np.random.default_rng(0)
+    n = 400
+    centers = rng.random((n, 3)) * (40, 30, 60) - (20, 15, -2)
+    radii = rng.random(n) * 1.5 + 0.2
+    camera = Camera(800, 600)
+    zbuffer = ZBuffer(800, 600)
+    selector = LodSelector()
+    levels_meshes = sphere_levels()
+    light = np.ones(3) / np.sqrt(3)
+
+    start = time.perf_counter()
+    projected, visible = screen_radius(camera, centers, radii)
+    levels = selector.select(projected)
+    zbuffer.clear()
+    triangles_drawn = 0
+    for level, mesh in enumerate(levels_meshes):
+        chosen = np.flatnonzero(visible & (levels == level))
+        if not len(chosen):
+            continue
+        vertices = (mesh.vertices * radii[chosen, None, None] + centers[chosen, None]).reshape(-1, 3)
+        triangles = (mesh.triangles + (np.arange(len(chosen)) * len(mesh.vertices))[:, None, None]).reshape(-1, 3)
+        front, colors = shade_faces(vertices, triangles, np.full((len(triangles), 3), 200),
+                                    light, eye=camera.eye)
+        zbuffer.draw_triangles(camera.project(vertices, dtype=np.float32), camera.depth(vertices),
+                               triangles[front], colors)
+        triangles_drawn += len(triangles)
+    elapsed = time.perf_counter() - start
+
+    full = n * len(levels_meshes[-1])
+    print(f"{n} spheres, {visible.sum()} on screen, levels {np.bincount(levels[visible], minlength=4)}: "
+          f"{triangles_drawn} triangles instead of {full}, frame in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,110 @@
+import numpy as np
+
+from face_pipeline import vertex_normals
+from zbuffer import triangulate
+
+# Vertex indices of the cube's six quads in create_cube()'s face order,
+# wound so that face normals point outwards (create_cube() wound them
+# inwards, which made back-face culling show the inside of the cube)
+CUBE_QUADS = [[3, 2, 1, 0], [5, 6, 7, 4], [1, 5, 4, 0],
+              [3, 7, 6, 2], [4, 7, 3, 0], [2, 6, 5, 1]]
+
+
+# Indexed triangle mesh: float32 (V, 3) vertices and int32 (F, 3) triangles.
+# Bounds and vertex normals are computed on first use and kept, so treat
+# the arrays as read-only once the mesh is built.
+class Mesh:
+    __slots__ = ('vertices', 'triangles', '_bounds', '_normals')
+
+    def __init__(self, vertices, triangles):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self.triangles = np.ascontiguousarray(triangles, dtype=np.int32).reshape(-1, 3)
+        self._bounds = None
+        self._normals = None
+
+    # Mesh from (F, K) polygon faces, split into fan triangles
+    @classmethod
+    def from_faces(cls, vertices, faces):
+        return cls(vertices, triangulate(np.asarray(faces)))
+
+    # (2, 3) array of the lowest and highest corner
+    @property
+    def bounds(self):
+        if self._bounds is None:
+            self._bounds = np.stack([self.vertices.min(axis=0), self.vertices.max(axis=0)])
+        return self._bounds
+
+    # Radius of the bounding sphere around the bounds' centre: the distance
+    # to the farthest vertex, so a unit sphere has radius 1
+    @property
+    def radius(self):
+        center = self.bounds.mean(axis=0)
+        return float(np.sqrt(((self.vertices - center) ** 2).sum(axis=1).max(initial=0)))
+
+    @property
+    def normals(self):
+        if self._normals is None:
+            self._normals = vertex_normals(self.vertices, self.triangles).astype(np.float32)
+        return self._normals
+
+    @property
+    def nbytes(self):
+        return self.vertices.nbytes + self.triangles.nbytes
+
+    def __len__(self):
+        return len(self.triangles)
+
+
+def cube_mesh(size=1.0):
+    corners = np.array([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                        [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]]) * size
+    return Mesh.from_faces(corners, CUBE_QUADS)
+
+
+# UV sphere with the latitude and longitude layout of create_sphere(): rings
+# from the south pole up, each of `segments` vertices, and quads split in
+# two. Each pole is a single vertex, so the rings next to it close with
+# triangle fans instead of degenerate quads. segments also sets the number
+# of latitude bands, so it needs at least 3 for two rings and a solid shape.
+def sphere_mesh(radius=1.0, segments=16):
+    if segments < 3:
+        raise ValueError(f"sphere needs at least 3 segments, got {segments}")
+    lat = np.pi * np.arange(1, segments) / segments - np.pi / 2
+    lon = 2 * np.pi * np.arange(segments) / segments
+    vertices = np.empty((2 + (segments - 1) * segments, 3), dtype=np.float32)
+    vertices[0], vertices[-1] = (0, -radius, 0), (0, radius, 0)
+    rings = vertices[1:-1].reshape(segments - 1, segments, 3)
+    ring = radius * np.cos(lat)[:, None]
+    rings[..., 0] = ring * np.cos(lon)
+    rings[..., 1] = radius * np.sin(lat)[:, None]
+    rings[..., 2] = ring * np.sin(lon)
+
+    # Vertex (i, j) of ring i = 1 .. segments - 1 is 1 + (i - 1) * segments + j;
+    # quad a b c d spans rings i and i + 1 and columns j and j + 1
+    north = len(vertices) - 1
+    j = np.arange(segments, dtype=np.int32)
+    after = (j + 1) % segments
+    triangles = np.empty((2 * segments + 2 * (segments - 2) * segments, 3), dtype=np.int32)
+    triangles[:segments] = np.stack([np.zeros_like(j), 1 + j, 1 + after], -1)
+    top = 1 + (segments - 2) * segments
+    triangles[-segments:] = np.stack([top + j, np.full_like(j, north), top + after], -1)
+
+    band = triangles[segments:-segments].reshape(segments - 2, segments, 2, 3)
+    first = (1 + np.arange(segments - 2, dtype=np.int32) * segments)[:, None]
+    a, d = first + j, first + after
+    band[:, :, 0, 0] = band[:, :, 1, 0] = a
+    band[:, :, 0, 1] = a + segments
+    band[:, :, 0, 2] = band[:, :, 1, 1] = d + segments
+    band[:, :, 1, 2] = d
+    return Mesh(vertices, triangles)
+
+
+if __name__ == "__main__":
+    import time
+
+    for segments in (16, 256, 1024):
+        start = time.perf_counter()
+        sphere = sphere_mesh(segments=segments)
+        elapsed = time.perf_counter() - start
+        print(f"sphere_mesh(segments={segments}): {len(sphere.vertices)} vertices, "
+              f"{len(sphere)} triangles, {sphere.nbytes / 1e6:.1f} MB in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,166 @@
+import numpy as np
+
+# Candidate pixels tested per pass; bounds the temporaries of one batch of
+# triangles to a few tens of MB
+CHUNK_PIXELS = 1 << 21
+
+
+# Split (F, K) faces into (F * (K - 2), 3) fan triangles, the triangles of
+# one face kept together
+def triangulate(faces):
+    faces = np.asarray(faces)
+    k = np.arange(1, faces.shape[1] - 1)
+    return np.stack([np.broadcast_to(faces[:, :1], (len(faces), len(k))),
+                     faces[:, k], faces[:, k + 1]], axis=-1).reshape(-1, 3)
+
+
+# Colour and depth buffer filled by a software rasterizer, for correct
+# occlusion without sorting faces.
+#
+# Triangles are given by screen positions (V, 2), view depths (V,) and
+# (T, 3) vertex indices. Every triangle covers the pixels of its bounding
+# box whose centre passes its three edge functions; all candidate pixels of
+# a batch of triangles are tested at once, so the cost follows the number of
+# pixels covered rather than the number of faces. Depth is tested on the
+# inverse view depth, which is linear in screen space; the buffer keeps the
+# largest, i.e. nearest, value. Triangles with a vertex at or behind
+# near are skipped.
+class ZBuffer:
+    def __init__(self, width, height, background=(0, 0, 0), near=0.1):
+        self.width, self.height = width, height
+        self.near = near
+        self.color = np.empty((height, width, 3), dtype=np.uint8)
+        self.inverse_depth = np.empty((height, width), dtype=np.float32)
+        self.clear(background)
+
+    def clear(self, background=None):
+        if background is not None:
+            self.background = background
+        self.color[...] = self.background
+        self.inverse_depth[...] = 0
+
+    # Flat shaded triangles, one (T, 3) colour each
+    def draw_triangles(self, screen, depth, triangles, colors):
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        color = self.color.reshape(-1, 3)
+        for pixels, tri, _ in self._fragments(screen, depth, triangles):
+            color[pixels] = colors[tri]
+
+    # Smooth shaded triangles: per-vertex attributes (V, K) are interpolated
+    # perspective-correctly to every pixel, and shade maps them (n, K) to a
+    # brightness (n,) that scales the triangle's (T, 3) base colour. Vertex
+    # intensities with shade=lambda v: v[:, 0] give Gouraud shading; vertex
+    # normals with a lighting function give Phong shading.
+    def draw_interpolated(self, screen, depth, triangles, colors, attributes, shade):
+        depth = np.asarray(depth, dtype=np.float64)
+        triangles = np.asarray(triangles, dtype=np.intp).reshape(-1, 3)
+        colors = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+        attributes = np.asarray(attributes, dtype=np.float64).reshape(len(depth), -1)
+        color = self.color.reshape(-1, 3)
+        for pixels, tri, weights in self._fragments(screen, depth, triangles):
+            corners = triangles[tri]
+            weights = weights / depth[corners]
+            weights /= weights.sum(axis=1, keepdims=True)
+            values = np.einsum('nk,nkj->nj', weights, attributes[corners])
+            shaded = colors[tri] * shade(values)[:, None]
+            color[pixels] = np.clip(shaded, 0, 255)
+
+    # Pixels (flat indices) won by the triangles, the triangle that won each
+    # and its (n, 3) barycentric weights there, one batch at a time
+    def _fragments(self, screen, depth, triangles):
+        screen = np.asarray(screen, dtype=np.float64).reshape(-1, 2)
+        depth = np.asarray(depth, dtype=np.float64)
+        triangles = np.asarray(triangles, dtype=np.intp).reshape(-1, 3)
+        ids = np.flatnonzero(np.all(depth[triangles] > self.near, axis=1))
+        triangles = triangles[ids]
+
+        (ax, ay), (bx, by), (cx, cy) = (screen[triangles[:, k]].T for k in range(3))
+        area = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        ys = screen[triangles, 1]
+        y0 = np.maximum(np.ceil(ys.min(axis=1) - 0.5), 0).astype(np.int64)
+        y1 = np.minimum(np.floor(ys.max(axis=1) - 0.5), self.height - 1).astype(np.int64)
+        keep = np.flatnonzero((area != 0) & (y1 >= y0))
+        if not len(keep):
+            return
+        ids, triangles, y0, y1 = ids[keep], triangles[keep], y0[keep], y1[keep]
+        ax, ay, bx, by, cx, cy, area = (v[keep] for v in (ax, ay, bx, by, cx, cy, area))
+
+        # Barycentric weights as planes w = A x + B y + C, shape (3, T), and
+        # the inverse depth plane they interpolate
+        A = np.stack([by - cy, cy - ay, ay - by]) / area
+        B = np.stack([cx - bx, ax - cx, bx - ax]) / area
+        C = np.stack([bx * cy - cx * by, cx * ay - ax * cy, ax * by - bx * ay]) / area
+        inverse = (1 / depth)[triangles].T
+        plane = np.stack([(A * inverse).sum(axis=0), (B * inverse).sum(axis=0),
+                          (C * inverse).sum(axis=0)])
+
+        # Every pixel row of every triangle, and the span of pixel centres on
+        # it where all three weights are >= 0
+        heights = y1 - y0 + 1
+        tri = np.repeat(np.arange(len(triangles)), heights)
+        row_y = np.arange(heights.sum()) - np.repeat(np.cumsum(heights) - heights, heights) + y0[tri]
+        offset = B[:, tri] * (row_y + 0.5) + C[:, tri]
+        slope = A[:, tri]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bound = -offset / slope
+        low = np.max(np.where(slope > 0, bound, -np.inf), axis=0)
+        high = np.min(np.where(slope < 0, bound, np.inf), axis=0)
+        high[np.any((slope == 0) & (offset < 0), axis=0)] = -np.inf
+        x0 = np.maximum(np.ceil(low - 0.5), 0)
+        x1 = np.minimum(np.floor(high - 0.5), self.width - 1)
+        rows = np.flatnonzero(x1 >= x0)
+        tri, row_y = tri[rows], row_y[rows]
+        x0 = x0[rows].astype(np.int64)
+        counts = x1[rows].astype(np.int64) - x0 + 1
+        if not len(rows):
+            return
+
+        ends = np.cumsum(counts)
+        cuts = np.searchsorted(ends, np.arange(CHUNK_PIXELS, ends[-1], CHUNK_PIXELS), 'right')
+        bounds = np.unique(np.concatenate([[0], cuts, [len(rows)]]))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            batch = slice(start, stop)
+            yield self._batch(counts[batch], x0[batch], row_y[batch], tri[batch],
+                              A, B, C, plane, ids)
+
+    def _batch(self, counts, x0, row_y, tri, A, B, C, plane, ids):
+        row = np.repeat(np.arange(len(counts)), counts)
+        px = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - x0, counts)
+        pixels = row_y[row] * self.width + px
+
+        center_y = row_y + 0.5
+        z = plane[0, tri][row] * (px + 0.5) + (plane[1, tri] * center_y + plane[2, tri])[row]
+        z = z.astype(np.float32)
+        buffer = self.inverse_depth.reshape(-1)
+        np.maximum.at(buffer, pixels, z)
+        won = np.flatnonzero(z >= buffer[pixels])
+
+        row, center_x = row[won], px[won] + 0.5
+        t = tri[row]
+        weights = A[:, t] * center_x + B[:, t] * center_y[row] + C[:, t]
+        return pixels[won], ids[t], weights.T
+
+    # Copy the colour buffer to a pygame surface of the same size
+    def present(self, surface):
+        import pygame
+
+        pygame.surfarray.blit_array(surface, self.color.swapaxes(0, 1))
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 20_000
+    centers = rng.random((n, 1, 2)) * (800, 600)
+    screen = (centers + rng.normal(0, 8, (n, 3, 2))).reshape(-1, 2)
+    depth = np.repeat(rng.random(n) * 10 + 1, 3)
+    triangles = np.arange(3 * n).reshape(-1, 3)
+    colors = rng.integers(0, 256, (n, 3))
+
+    zbuffer = ZBuffer(800, 600)
+    start = time.perf_counter()
+    for _ in range(10):
+        zbuffer.clear()
+        zbuffer.draw_triangles(screen, depth, triangles, colors)
+    print(f"{n} triangles in {(time.perf_counter() - start) * 100:.1f} ms per frame")
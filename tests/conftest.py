@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The experiment folders are plain script directories, not packages
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for folder in ('Experiment 1', 'Experiment 2', 'Experiment 3', 'Exp4', 'exp5', 'exp6'):
+    sys.path.append(os.path.join(ROOT, folder))
@@ -0,0 +1,27 @@
+import numpy as np
+
+from camera import Camera
+
+
+def test_projection_fills_reused_buffers():
+    camera = Camera(800, 600, focal=300)
+    points = np.array([[0, 0, 0], [1, 1, 1], [0, 0, -5.05]], dtype=np.float64)
+    screen = np.empty((3, 2), dtype=np.int32)
+    depths = np.empty(3)
+
+    assert camera.project(points, out=screen) is screen
+    assert camera.depth(points, out=depths) is depths
+    np.testing.assert_allclose(depths, [5, 6, -0.05])
+    assert screen[0].tolist() == [400, 300]
+
+
+def test_edges_project_into_buffer():
+    camera = Camera(800, 600, focal=300)
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 0, -6], [0, 1, -7]], dtype=np.float64)
+    segments = np.empty((2, 4), dtype=np.int32)
+
+    result, visible = camera.project_edges(points, [(0, 1), (2, 3)], out=segments)
+
+    assert result is segments
+    assert visible.tolist() == [True, False]
+    assert segments[1].tolist() == [0, 0, 0, 0]
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from circle_raster import circle_offsets, disc_half_widths, disc_spans, draw_circles
+
+
+def test_zero_radius_is_the_centre_pixel():
+    dx, dy = circle_offsets(0)
+    assert dx.tolist() == [0] and dy.tolist() == [0]
+
+
+@pytest.mark.parametrize('helper', [circle_offsets, disc_half_widths])
+def test_negative_radius_is_rejected(helper):
+    with pytest.raises(ValueError):
+        helper(-3)
+
+
+@pytest.mark.parametrize('filled', [False, True])
+def test_draw_rejects_negative_radius(filled):
+    canvas = np.zeros((16, 16), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        draw_circles(canvas, [[8, 8], [4, 4]], [3, -2], 1, filled=filled)
+    with pytest.raises(ValueError):
+        disc_spans([[8, 8]], [-1])
+    assert not canvas.any()
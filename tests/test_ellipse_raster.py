@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from ellipse_raster import draw_ellipses, ellipse_offsets, ellipse_quadrant
+
+
+def test_zero_radii_give_centre_pixel():
+    dx, dy = ellipse_offsets(0, 0)
+    assert dx.tolist() == [0] and dy.tolist() == [0]
+
+
+def test_one_zero_radius_gives_straight_line():
+    dx, dy = ellipse_offsets(0, 3)
+    assert dx.tolist() == [0] * 7 and sorted(dy.tolist()) == list(range(-3, 4))
+    dx, dy = ellipse_offsets(4, 0)
+    assert sorted(dx.tolist()) == list(range(-4, 5)) and dy.tolist() == [0] * 9
+
+
+def test_negative_radius_is_rejected():
+    with pytest.raises(ValueError):
+        ellipse_quadrant(-1, 2)
+
+
+@pytest.mark.parametrize('filled', [False, True])
+@pytest.mark.parametrize('angle', [0.0, 30.0])
+def test_draw_degenerate_ellipses(filled, angle):
+    canvas = np.zeros((16, 16), dtype=np.uint8)
+    draw_ellipses(canvas, [[8, 8], [8, 8], [8, 8]], [0, 0, 3], [0, 3, 0], 1,
+                  angle=angle, filled=filled)
+    assert canvas[8, 8] == 1
+    assert canvas.sum() > 1
@@ -0,0 +1,23 @@
+import numpy as np
+
+from fill_raster import flood_fill
+
+
+def test_flood_fill_on_strided_rgba_canvas():
+    big = np.zeros((10, 20, 4), dtype=np.uint8)
+    big[..., 3] = 255
+    canvas = big[:, ::2]
+    assert not canvas.flags.c_contiguous
+
+    flood_fill(canvas, 3, 3, (255, 0, 0, 255))
+
+    filled = (big[:, ::2] == (255, 0, 0, 255)).all(axis=2)
+    assert filled.sum() == 100
+    assert not big[:, 1::2, 0].any()
+
+
+def test_flood_fill_rgba_respects_alpha():
+    canvas = np.zeros((4, 4, 4), dtype=np.uint8)
+    canvas[:, 2:, 3] = 255
+    flood_fill(canvas[:, ::1], 0, 0, (9, 9, 9, 0))
+    assert (canvas[:, :2, 0] == 9).all() and not canvas[:, 2:, 0].any()
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from mesh import sphere_mesh
+
+
+@pytest.mark.parametrize('segments', [0, 1, 2])
+def test_sphere_rejects_too_few_segments(segments):
+    with pytest.raises(ValueError):
+        sphere_mesh(segments=segments)
+
+
+@pytest.mark.parametrize('segments', [3, 16])
+def test_sphere_has_no_degenerate_triangles(segments):
+    mesh = sphere_mesh(segments=segments)
+    v0, v1, v2 = (mesh.vertices[mesh.triangles[:, k]] for k in range(3))
+    assert (np.linalg.norm(np.cross(v1 - v0, v2 - v0), axis=1) > 0).all()
+
+
+@pytest.mark.parametrize('segments', [3, 16])
+def test_sphere_radius_is_farthest_vertex(segments):
+    mesh = sphere_mesh(radius=2.0, segments=segments)
+    distance = np.linalg.norm(mesh.vertices - mesh.bounds.mean(axis=0), axis=1)
+    assert mesh.radius == pytest.approx(distance.max())
+    if segments % 2 == 0:
+        assert mesh.radius == pytest.approx(2.0, rel=1e-6)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from render_batch import main, render_job
+
+
+def _job(output, rx, ry):
+    return {'output': output, 'width': 32, 'height': 32,
+            'primitives': [{'type': 'ellipse', 'centers': [[16, 16]],
+                            'rx': rx, 'ry': ry, 'filled': True}]}
+
+
+def test_bad_radius_names_the_job():
+    with pytest.raises(ValueError, match='job 3'):
+        render_job(_job('bad.ppm', -4, 2), index=3)
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_batch_with_degenerate_ellipse_finishes(tmp_path, workers):
+    jobs = [_job('zero.ppm', 0, 0), _job('line.ppm', 0, 5),
+            _job('bad.ppm', -1, 5), _job('ok.ppm', 8, 4)]
+    path = tmp_path / 'jobs.json'
+    path.write_text(json.dumps(jobs))
+    report = tmp_path / 'report.json'
+
+    status = main([str(path), '-o', str(tmp_path), '-j', workers,
+                   '--report', str(report)])
+
+    results = json.loads(report.read_text())['jobs']
+    assert status == 1
+    assert [('error' in r) for r in results] == [False, False, True, False]
+    assert 'job 2' in results[2]['error']
+    for name in ('zero.ppm', 'line.ppm', 'ok.ppm'):
+        assert (tmp_path / name).exists()
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_batch_reports_malformed_and_unwritable_jobs(tmp_path, workers):
+    (tmp_path / 'taken').write_text('')
+    no_type = _job('no_type.ppm', 3, 3)
+    del no_type['primitives'][0]['type']
+    no_radii = {'output': 'no_radii.ppm', 'width': 8, 'height': 8,
+                'primitives': [{'type': 'circle', 'centers': [[4, 4]]}]}
+    no_width = {'output': 'no_width.ppm', 'height': 8, 'primitives': []}
+    unwritable = _job('taken/out.ppm', 3, 3)
+    jobs = [no_type, no_radii, no_width, unwritable, _job('ok.ppm', 8, 4)]
+    path = tmp_path / 'jobs.json'
+    path.write_text(json.dumps(jobs))
+    report = tmp_path / 'report.json'
+
+    status = main([str(path), '-o', str(tmp_path), '-j', workers,
+                   '--report', str(report)])
+
+    results = json.loads(report.read_text())['jobs']
+    assert status == 1
+    assert [('error' in r) for r in results] == [True, True, True, True, False]
+    for index, result in enumerate(results[:4]):
+        assert result['error'].startswith(f'job {index} ')
+    assert "'type'" in results[0]['error'] and "'radii'" in results[1]['error']
+    assert (tmp_path / 'ok.ppm').exists()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from clipping import clip_polygons, pack_polygons
+from spatial_index import GridIndex
+
+
+def _scene(n, seed=0):
+    rng = np.random.default_rng(seed)
+    sides = rng.integers(3, 8, n)
+    angle = np.sort(rng.random((n, 7)) * 2 * np.pi, axis=1)
+    centers = rng.random((n, 1, 2)) * 1200 - 100
+    footprints = centers + 25 * np.stack([np.cos(angle), np.sin(angle)], axis=2)
+    return pack_polygons([f[:k] for f, k in zip(footprints, sides)])
+
+
+@pytest.mark.parametrize('window', [(0, 0, 1000, 1000), (300, 200, 520, 610),
+                                    (-500, -500, 2000, 2000), (5000, 0, 6000, 10)])
+def test_indexed_clip_matches_clipping_everything(window):
+    vertices, offsets = _scene(2000)
+    expected = clip_polygons(vertices, offsets, window)
+    clipped = GridIndex.from_polygons(vertices, offsets).clip(vertices, offsets, window)
+    np.testing.assert_array_equal(clipped[1], expected[1])
+    np.testing.assert_allclose(clipped[0], expected[0])
+
+
+def test_indexed_clip_after_update():
+    vertices, offsets = _scene(500, seed=1)
+    index = GridIndex.from_polygons(vertices, offsets)
+    moved = np.arange(0, 500, 50)
+    for i in moved:
+        vertices[offsets[i]:offsets[i + 1]] += 400
+    index.update(moved, [vertices[offsets[i]:offsets[i + 1]].min(axis=0).tolist() +
+                         vertices[offsets[i]:offsets[i + 1]].max(axis=0).tolist()
+                         for i in moved])
+    window = (100, 100, 700, 700)
+    expected = clip_polygons(vertices, offsets, window)
+    clipped = index.clip(vertices, offsets, window)
+    np.testing.assert_array_equal(clipped[1], expected[1])
+    np.testing.assert_allclose(clipped[0], expected[0])
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from transform2d import Transform2D
+
+
+def _transform():
+    return Transform2D().scale(1.5, 2).rotate(30).translate(120, 50)
+
+
+def _expected(transform, points):
+    return points @ transform.matrix[:2, :2].T + transform.matrix[:2, 2]
+
+
+def test_apply_into_column_slice():
+    points = np.random.default_rng(0).random((100, 2)) * 100
+    buffer = np.zeros((100, 3))
+    out = buffer[:, 1:]
+    assert not out.flags.c_contiguous
+
+    result = _transform().apply(points, out=out)
+
+    assert result is out
+    np.testing.assert_allclose(buffer[:, 1:], _expected(_transform(), points))
+    assert not buffer[:, 0].any()
+
+
+def test_apply_into_transposed_buffer_in_place():
+    buffer = np.random.default_rng(1).random((2, 50)) * 100
+    points = buffer.T
+    expected = _expected(_transform(), points.copy())
+
+    _transform().apply(points, out=points)
+
+    np.testing.assert_allclose(buffer.T, expected)
+
+
+def test_apply_rejects_unusable_out():
+    points = np.zeros((4, 2))
+    with pytest.raises(ValueError):
+        _transform().apply(points, out=np.zeros((5, 2)))
+    with pytest.raises(ValueError):
+        _transform().apply(points, out=np.zeros((4, 2), dtype=np.int64))
+    with pytest.raises(ValueError):
+        _transform().apply(np.zeros((2, 2, 2)), out=np.zeros((2, 2, 4))[..., ::2])